@@ -9,6 +9,7 @@ beforeAll(async () => {
   db = await openTestDb();
   const indexModule = require('../index');
   app = indexModule.app;
+  await indexModule.dbReady;
 }, 30000);
 
 afterAll(async () => {
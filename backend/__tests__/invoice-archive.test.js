@@ -0,0 +1,196 @@
+const request = require('supertest');
+const { initializeTestDb, resetTestDb, openTestDb, closeTestDb } = require('./helpers/testDatabase');
+
+let app;
+let db;
+let appDb;
+let attachArchive;
+
+beforeAll(async () => {
+  await initializeTestDb();
+  db = await openTestDb();
+  const indexModule = require('../index');
+  app = indexModule.app;
+  await indexModule.dbReady;
+  // The app's own connection is the one the archive gets attached to
+  appDb = await require('../database').openDb();
+  attachArchive = require('../archive').attachArchive;
+}, 30000);
+
+afterAll(async () => {
+  await closeTestDb();
+});
+
+beforeEach(async () => {
+  await resetTestDb();
+  await attachArchive(appDb);
+  await appDb.exec('DELETE FROM archive.invoice_items; DELETE FROM archive.invoices;');
+});
+
+// Helper: insert an invoice with one line item directly
+async function createInvoice({ clientId, itemId, invoiceNumber, invoiceDate, paymentStatus }) {
+  const result = await db.run(
+    `INSERT INTO invoices (clientId, invoiceNumber, invoiceDate, paymentStatus, total, amountPaid)
+     VALUES (?, ?, ?, ?, 100, ?)`,
+    [clientId, invoiceNumber, invoiceDate, paymentStatus, paymentStatus === 'paid' ? 100 : 0]
+  );
+  await db.run(
+    'INSERT INTO invoice_items (invoiceId, itemId, quantity, price) VALUES (?, ?, 2, 50)',
+    [result.lastID, itemId]
+  );
+  return result.lastID;
+}
+
+describe('Invoice Archive', () => {
+  let clientId;
+  let itemId;
+  const today = new Date().toISOString().split('T')[0];
+
+  beforeEach(async () => {
+    clientId = (await db.run('INSERT INTO clients (name) VALUES (?)', ['Archive Client'])).lastID;
+    itemId = (await db.run('INSERT INTO items (name, price, cost) VALUES (?, ?, ?)', ['Archive Item', 50, 20])).lastID;
+  });
+
+  test('moves only old paid and voided invoices with their items', async () => {
+    const oldPaid = await createInvoice({ clientId, itemId, invoiceNumber: 'INV-2020-001', invoiceDate: '2020-01-15', paymentStatus: 'paid' });
+    const oldVoided = await createInvoice({ clientId, itemId, invoiceNumber: 'INV-2020-002', invoiceDate: '2020-02-15', paymentStatus: 'voided' });
+    const oldUnpaid = await createInvoice({ clientId, itemId, invoiceNumber: 'INV-2020-003', invoiceDate: '2020-03-15', paymentStatus: 'unpaid' });
+    const recentPaid = await createInvoice({ clientId, itemId, invoiceNumber: 'INV-2025-001', invoiceDate: today, paymentStatus: 'paid' });
+
+    const res = await request(app)
+      .post('/invoices/archive')
+      .send({ olderThanDays: 365 })
+      .expect(200);
+
+    expect(res.body.invoices).toBe(2);
+    expect(res.body.items).toBe(2);
+
+    const remaining = await db.all('SELECT id FROM invoices ORDER BY id');
+    expect(remaining.map(r => r.id)).toEqual([oldUnpaid, recentPaid]);
+
+    const remainingItems = await db.get('SELECT COUNT(*) as count FROM invoice_items WHERE invoiceId IN (?, ?)', [oldPaid, oldVoided]);
+    expect(remainingItems.count).toBe(0);
+
+    const archived = await appDb.all('SELECT id FROM archive.invoices ORDER BY id');
+    expect(archived.map(r => r.id)).toEqual([oldPaid, oldVoided]);
+  });
+
+  test('stale archive copies of invoices still in main are dropped, not moved', async () => {
+    // Left behind when an invoice is edited (here: reopened) after being copied
+    const reopened = await createInvoice({ clientId, itemId, invoiceNumber: 'INV-2020-001', invoiceDate: '2020-01-15', paymentStatus: 'unpaid' });
+    const line = await db.get('SELECT id FROM invoice_items WHERE invoiceId = ?', [reopened]);
+    await appDb.run(
+      "INSERT INTO archive.invoices (id, clientId, invoiceNumber, invoiceDate, paymentStatus, total) VALUES (?, ?, 'INV-2020-001', '2020-01-15', 'paid', 100)",
+      [reopened, clientId]
+    );
+    await appDb.run(
+      'INSERT INTO archive.invoice_items (id, invoiceId, itemId, quantity, price) VALUES (?, ?, ?, 2, 50)',
+      [line.id, reopened, itemId]
+    );
+
+    const res = await request(app).post('/invoices/archive').send({ olderThanDays: 365 }).expect(200);
+
+    expect(res.body.invoices).toBe(0);
+    const invoice = await db.get('SELECT paymentStatus FROM invoices WHERE id = ?', [reopened]);
+    expect(invoice.paymentStatus).toBe('unpaid');
+    const lines = await db.get('SELECT COUNT(*) as count FROM invoice_items WHERE invoiceId = ?', [reopened]);
+    expect(lines.count).toBe(1);
+    const archived = await appDb.get('SELECT COUNT(*) as count FROM archive.invoices');
+    expect(archived.count).toBe(0);
+    const archivedLines = await appDb.get('SELECT COUNT(*) as count FROM archive.invoice_items');
+    expect(archivedLines.count).toBe(0);
+  });
+
+  test('uses archiveAfterDays setting when no age is given', async () => {
+    await createInvoice({ clientId, itemId, invoiceNumber: 'INV-2020-001', invoiceDate: '2020-01-15', paymentStatus: 'paid' });
+    await db.run('UPDATE settings SET archiveAfterDays = 100000 WHERE id = 1');
+
+    const res = await request(app).post('/invoices/archive').send({}).expect(200);
+
+    expect(res.body.invoices).toBe(0);
+  });
+
+  test('archive schema is stamped with the main schema version', async () => {
+    const { user_version: mainVersion } = await appDb.get('PRAGMA main.user_version');
+    const { user_version: archiveVersion } = await appDb.get('PRAGMA archive.user_version');
+
+    expect(archiveVersion).toBe(mainVersion);
+  });
+
+  test('rejects a negative archive age', async () => {
+    const res = await request(app)
+      .post('/invoices/archive')
+      .send({ olderThanDays: -5 })
+      .expect(400);
+
+    expect(res.body.message).toMatch(/non-negative/);
+  });
+
+  test('rejects an invalid archiveAfterDays setting', async () => {
+    const before = await db.get('SELECT archiveAfterDays FROM settings WHERE id = 1');
+
+    const res = await request(app)
+      .put('/settings')
+      .send({ businessName: 'Test Business', taxRate: 0.08, archiveAfterDays: 'soon' })
+      .expect(400);
+
+    expect(res.body.message).toMatch(/Archive age/);
+    const after = await db.get('SELECT archiveAfterDays FROM settings WHERE id = 1');
+    expect(after.archiveAfterDays).toBe(before.archiveAfterDays);
+  });
+
+  test('invoice list spans the archive only when asked', async () => {
+    await createInvoice({ clientId, itemId, invoiceNumber: 'INV-2020-001', invoiceDate: '2020-01-15', paymentStatus: 'paid' });
+    await createInvoice({ clientId, itemId, invoiceNumber: 'INV-2025-001', invoiceDate: today, paymentStatus: 'unpaid' });
+    await request(app).post('/invoices/archive').send({ olderThanDays: 365 }).expect(200);
+
+    const hot = await request(app).get('/invoices').expect(200);
+    expect(hot.body.map(i => i.invoiceNumber)).toEqual(['INV-2025-001']);
+
+    const all = await request(app).get('/invoices?includeArchived=true').expect(200);
+    expect(all.body).toHaveLength(2);
+    const archived = all.body.find(i => i.invoiceNumber === 'INV-2020-001');
+    expect(archived.archived).toBe(1);
+    expect(archived.clientName).toBe('Archive Client');
+  });
+
+  test('archived invoice can still be loaded with its items', async () => {
+    const oldPaid = await createInvoice({ clientId, itemId, invoiceNumber: 'INV-2020-001', invoiceDate: '2020-01-15', paymentStatus: 'paid' });
+    await request(app).post('/invoices/archive').send({ olderThanDays: 365 }).expect(200);
+
+    const res = await request(app).get(`/invoices/${oldPaid}`).expect(200);
+
+    expect(res.body.archived).toBe(1);
+    expect(res.body.items).toHaveLength(1);
+    expect(res.body.items[0].itemName).toBe('Archive Item');
+  });
+
+  test('new invoice cannot reuse an archived invoice number', async () => {
+    const year = new Date().getFullYear();
+    await createInvoice({ clientId, itemId, invoiceNumber: `INV-${year}-001`, invoiceDate: '2020-01-15', paymentStatus: 'paid' });
+    await request(app).post('/invoices/archive').send({ olderThanDays: 365 }).expect(200);
+    // As after "reset sequence" in Settings
+    await db.run('UPDATE settings SET invoiceNumberNextSequence = 1 WHERE id = 1');
+    await db.run('UPDATE items SET inventory = 10 WHERE id = ?', [itemId]);
+
+    const res = await request(app)
+      .post('/invoices')
+      .send({ clientId, items: [{ itemId, quantity: 1, price: 50 }], total: 54, invoiceDate: today })
+      .expect(400);
+
+    expect(res.body.message).toMatch(/Invoice number conflict/);
+    const count = await db.get('SELECT COUNT(*) as count FROM invoices');
+    expect(count.count).toBe(0);
+  });
+
+  test('client and item with archived invoices cannot be deleted', async () => {
+    await createInvoice({ clientId, itemId, invoiceNumber: 'INV-2020-001', invoiceDate: '2020-01-15', paymentStatus: 'paid' });
+    await request(app).post('/invoices/archive').send({ olderThanDays: 365 }).expect(200);
+
+    const clientRes = await request(app).delete(`/clients/${clientId}`).expect(400);
+    expect(clientRes.body.message).toMatch(/1 invoice/);
+
+    const itemRes = await request(app).delete(`/items/${itemId}`).expect(400);
+    expect(itemRes.body.message).toMatch(/1 invoice/);
+  });
+});
@@ -0,0 +1,235 @@
+const request = require('supertest');
+const { initializeTestDb, resetTestDb, openTestDb, closeTestDb } = require('./helpers/testDatabase');
+const { computeInvoiceTotals, backfillInvoiceTotals } = require('../invoice-totals');
+
+let app;
+let db;
+
+beforeAll(async () => {
+  await initializeTestDb();
+  db = await openTestDb();
+  const indexModule = require('../index');
+  app = indexModule.app;
+  await indexModule.dbReady;
+}, 30000);
+
+afterAll(async () => {
+  await closeTestDb();
+});
+
+beforeEach(async () => {
+  await resetTestDb();
+});
+
+describe('Invoice Totals', () => {
+  describe('computeInvoiceTotals', () => {
+    test('splits taxable and exempt lines and rounds tax per line', () => {
+      const totals = computeInvoiceTotals([
+        { quantity: 3, price: 3.33, taxExempt: false, unitCost: 1 },
+        { quantity: 1, price: 10, taxExempt: true, unitCost: 4 }
+      ], { taxRate: 0.08, sellingFeePercent: 3, sellingFeeFixed: 0.25 });
+
+      expect(totals.subtotal).toBe(19.99);
+      expect(totals.taxableSubtotal).toBe(9.99);
+      expect(totals.tax).toBe(0.8);
+      expect(totals.cogs).toBe(7);
+      expect(totals.sellingFees).toBe(0.85); // 19.99 * 3% + 0.25
+    });
+
+    test('tax is derived from the submitted total when one is given', () => {
+      const totals = computeInvoiceTotals(
+        [{ quantity: 2, price: 10, taxExempt: false, unitCost: 4 }],
+        { taxRate: 0.1 },
+        { total: 26.6, shipping: 5 }
+      );
+      // 26.60 total - 20.00 subtotal - 5.00 shipping, not 10% of 20
+      expect(totals.tax).toBe(1.6);
+    });
+
+    test('no fixed selling fee on an empty invoice', () => {
+      const totals = computeInvoiceTotals([], { taxRate: 0.08, sellingFeePercent: 3, sellingFeeFixed: 0.25 });
+      expect(totals.sellingFees).toBe(0);
+    });
+  });
+
+  describe('Stored on write', () => {
+    let clientId;
+    let itemId;
+
+    beforeEach(async () => {
+      clientId = (await db.run('INSERT INTO clients (name) VALUES (?)', ['Totals Client'])).lastID;
+      itemId = (await db.run(
+        'INSERT INTO items (name, price, cost, inventory) VALUES (?, ?, ?, ?)',
+        ['Totals Item', 25, 10, 100]
+      )).lastID;
+    });
+
+    test('POST /invoices stores totals and a unit cost snapshot', async () => {
+      const res = await request(app)
+        .post('/invoices')
+        .send({
+          clientId,
+          items: [{ itemId, quantity: 4, price: 25, taxExempt: false }],
+          total: 108,
+          invoiceDate: '2025-03-01'
+        })
+        .expect(200);
+
+      const invoice = await db.get('SELECT * FROM invoices WHERE id = ?', [res.body.id]);
+      expect(invoice.subtotal).toBe(100);
+      expect(invoice.taxableSubtotal).toBe(100);
+      expect(invoice.tax).toBe(8);
+      expect(invoice.cogs).toBe(40);
+
+      const line = await db.get('SELECT unitCost FROM invoice_items WHERE invoiceId = ?', [res.body.id]);
+      expect(line.unitCost).toBe(10);
+    });
+
+    test('later item cost changes do not alter sold invoices', async () => {
+      const res = await request(app)
+        .post('/invoices')
+        .send({ clientId, items: [{ itemId, quantity: 2, price: 25 }], total: 54, invoiceDate: '2025-03-01' })
+        .expect(200);
+
+      await db.run('UPDATE items SET cost = 99 WHERE id = ?', [itemId]);
+
+      const detail = await request(app).get(`/invoices/${res.body.id}`).expect(200);
+      expect(detail.body.cogs).toBe(20);
+      expect(detail.body.items[0].itemCost).toBe(10);
+    });
+
+    test('PUT /invoices/:id recomputes stored totals', async () => {
+      const res = await request(app)
+        .post('/invoices')
+        .send({ clientId, items: [{ itemId, quantity: 2, price: 25 }], total: 54, invoiceDate: '2025-03-01' })
+        .expect(200);
+
+      await request(app)
+        .put(`/invoices/${res.body.id}`)
+        .send({
+          clientId,
+          items: [{ itemId, quantity: 5, price: 20, taxExempt: true }],
+          total: 100,
+          invoiceDate: '2025-03-01',
+          dueDate: '2025-03-31',
+          paymentStatus: 'unpaid'
+        })
+        .expect(200);
+
+      const invoice = await db.get('SELECT subtotal, taxableSubtotal, tax, cogs FROM invoices WHERE id = ?', [res.body.id]);
+      expect(invoice).toEqual({ subtotal: 100, taxableSubtotal: 0, tax: 0, cogs: 50 });
+    });
+
+    test('PUT /invoices/:id keeps cost snapshots for lines already on the invoice', async () => {
+      const res = await request(app)
+        .post('/invoices')
+        .send({ clientId, items: [{ itemId, quantity: 2, price: 25 }], total: 54, invoiceDate: '2025-03-01' })
+        .expect(200);
+
+      await db.run('UPDATE items SET cost = 99 WHERE id = ?', [itemId]);
+      await db.run('UPDATE settings SET sellingFeePercent = 10 WHERE id = 1');
+
+      await request(app)
+        .put(`/invoices/${res.body.id}`)
+        .send({
+          clientId,
+          items: [{ itemId, quantity: 2, price: 25 }],
+          total: 54,
+          invoiceDate: '2025-03-01',
+          dueDate: '2025-03-31',
+          paymentStatus: 'paid'
+        })
+        .expect(200);
+
+      const invoice = await db.get('SELECT cogs, sellingFees FROM invoices WHERE id = ?', [res.body.id]);
+      expect(invoice).toEqual({ cogs: 20, sellingFees: 0 });
+      const line = await db.get('SELECT unitCost FROM invoice_items WHERE invoiceId = ?', [res.body.id]);
+      expect(line.unitCost).toBe(10);
+    });
+
+    test('item sales report aggregates lines with snapshot costs', async () => {
+      await request(app)
+        .post('/invoices')
+        .send({ clientId, items: [{ itemId, quantity: 2, price: 25 }], total: 54, invoiceDate: '2025-03-01' })
+        .expect(200);
+      await request(app)
+        .post('/invoices')
+        .send({ clientId, items: [{ itemId, quantity: 3, price: 20 }], total: 64.8, invoiceDate: '2025-04-01' })
+        .expect(200);
+
+      const all = await request(app).get('/reports/item-sales').expect(200);
+      expect(all.body).toEqual([
+        { itemName: 'Totals Item', qty: 5, revenue: 110, cost: 50, invoiceCount: 2 }
+      ]);
+
+      const march = await request(app).get('/reports/item-sales?from=2025-03-01&to=2025-03-31').expect(200);
+      expect(march.body[0].qty).toBe(2);
+    });
+  });
+
+  describe('Report summary', () => {
+    beforeEach(async () => {
+      const rows = [
+        ['INV-2025-001', '2025-01-10', 'paid', 108, 100, 100, 8, 40, 3],
+        ['INV-2025-002', '2025-02-20', 'unpaid', 50, 50, 0, 0, 20, 1.5],
+        ['INV-2025-003', '2025-04-05', 'paid', 54, 50, 50, 4, 20, 1.5],
+        ['INV-2025-004', '2025-04-06', 'voided', 999, 999, 999, 80, 0, 0]
+      ];
+      for (const row of rows) {
+        await db.run(
+          `INSERT INTO invoices (invoiceNumber, invoiceDate, paymentStatus, total, subtotal, taxableSubtotal, tax, cogs, sellingFees)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)`,
+          row
+        );
+      }
+    });
+
+    test('groups stored totals by quarter and skips voided invoices', async () => {
+      const res = await request(app).get('/reports/summary?period=quarter').expect(200);
+
+      expect(res.body).toEqual([
+        {
+          period: '2025-Q2', invoiceCount: 1, paidCount: 1, revenue: 54, collected: 54,
+          subtotal: 50, taxableSubtotal: 50, tax: 4, paidTax: 4, cogs: 20, sellingFees: 1.5
+        },
+        {
+          period: '2025-Q1', invoiceCount: 2, paidCount: 1, revenue: 158, collected: 108,
+          subtotal: 150, taxableSubtotal: 100, tax: 8, paidTax: 8, cogs: 60, sellingFees: 4.5
+        }
+      ]);
+    });
+
+    test('filters by date range', async () => {
+      const res = await request(app).get('/reports/summary?from=2025-02-01&to=2025-04-05').expect(200);
+
+      expect(res.body).toHaveLength(1);
+      expect(res.body[0]).toMatchObject({ period: 'all', invoiceCount: 2, revenue: 104 });
+    });
+
+    test('rejects an unknown period', async () => {
+      await request(app).get('/reports/summary?period=week').expect(400);
+    });
+  });
+
+  describe('Backfill', () => {
+    test('fills totals and cost snapshots for rows written before they existed', async () => {
+      const itemId = (await db.run('INSERT INTO items (name, price, cost) VALUES (?, ?, ?)', ['Legacy Item', 10, 4])).lastID;
+      const invoiceId = (await db.run(
+        "INSERT INTO invoices (invoiceNumber, invoiceDate, total, shipping) VALUES ('INV-2020-001', '2020-01-01', 26.6, 5)"
+      )).lastID;
+      await db.run('INSERT INTO invoice_items (invoiceId, itemId, quantity, price) VALUES (?, ?, 2, 10)', [invoiceId, itemId]);
+
+      const filled = await backfillInvoiceTotals(db);
+
+      expect(filled).toBe(1);
+      const invoice = await db.get('SELECT subtotal, tax, cogs FROM invoices WHERE id = ?', [invoiceId]);
+      // Tax is what was charged: 26.60 total - 20.00 subtotal - 5.00 shipping
+      expect(invoice).toEqual({ subtotal: 20, tax: 1.6, cogs: 8 });
+
+      const line = await db.get('SELECT unitCost FROM invoice_items WHERE invoiceId = ?', [invoiceId]);
+      expect(line.unitCost).toBe(4);
+
+      expect(await backfillInvoiceTotals(db)).toBe(0);
+    });
+  });
+});
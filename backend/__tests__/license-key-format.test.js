@@ -0,0 +1,32 @@
+const crypto = require('crypto');
+const {
+  KEY_VERSION,
+  base32Encode,
+  base32Decode,
+  getKeyVersion,
+  buildLicenseKey
+} = require('../../tools/license-generator');
+
+describe('License Key Format', () => {
+  test('base32Decode reverses base32Encode', () => {
+    for (const length of [0, 1, 5, 17]) {
+      const buffer = crypto.randomBytes(length);
+      const encoded = base32Encode(buffer);
+
+      expect(base32Decode(encoded)).toEqual(buffer);
+    }
+  });
+
+  test('base32Decode rejects characters outside the alphabet', () => {
+    expect(() => base32Decode('ABCU')).toThrow('Invalid Base32 character: U');
+  });
+
+  test('generated keys carry the payload version', () => {
+    const { privateKey } = crypto.generateKeyPairSync('ed25519');
+    const key = buildLicenseKey(privateKey, 1700000000);
+    const keyPart = key.split('.')[0];
+
+    expect(getKeyVersion(keyPart)).toBe(KEY_VERSION);
+    expect(getKeyVersion('!!!!!-00000')).toBeNull();
+  });
+});
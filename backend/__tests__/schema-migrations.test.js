@@ -0,0 +1,129 @@
+const sqlite3 = require('sqlite3').verbose();
+const { open } = require('sqlite');
+const path = require('path');
+const fs = require('fs');
+const { runMigrations, LATEST_VERSION } = require('../init-db');
+
+const MIGRATION_DB_PATH = path.join(__dirname, 'migration-test.db');
+
+let db;
+
+function removeDbFiles() {
+  [MIGRATION_DB_PATH, `${MIGRATION_DB_PATH}-shm`, `${MIGRATION_DB_PATH}-wal`].forEach(file => {
+    if (fs.existsSync(file)) {
+      fs.unlinkSync(file);
+    }
+  });
+}
+
+beforeEach(async () => {
+  removeDbFiles();
+  db = await open({ filename: MIGRATION_DB_PATH, driver: sqlite3.Database });
+});
+
+afterEach(async () => {
+  await db.close();
+  removeDbFiles();
+});
+
+async function getUserVersion() {
+  const row = await db.get('PRAGMA user_version');
+  return row.user_version;
+}
+
+describe('Schema Migrations', () => {
+  test('fresh database is migrated to the latest version', async () => {
+    const result = await runMigrations(db);
+
+    expect(result.from).toBe(0);
+    expect(result.to).toBe(LATEST_VERSION);
+    expect(await getUserVersion()).toBe(LATEST_VERSION);
+
+    const tables = await db.all("SELECT name FROM sqlite_master WHERE type = 'table'");
+    const tableNames = tables.map(t => t.name);
+    expect(tableNames).toEqual(expect.arrayContaining([
+      'clients', 'items', 'item_components', 'invoices', 'invoice_items', 'settings'
+    ]));
+
+    const settings = await db.get('SELECT * FROM settings WHERE id = 1');
+    expect(settings).toBeDefined();
+  });
+
+  test('up-to-date database applies nothing', async () => {
+    await runMigrations(db);
+    const result = await runMigrations(db);
+
+    expect(result.applied).toEqual([]);
+    expect(await getUserVersion()).toBe(LATEST_VERSION);
+  });
+
+  test('pre-versioning database keeps its data and gains missing columns', async () => {
+    // Legacy layout: no user_version, old item_components column names, no shipping column
+    await db.exec(`
+      CREATE TABLE items (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL UNIQUE, price REAL NOT NULL);
+      CREATE TABLE item_components (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        itemId INTEGER NOT NULL,
+        inventoryProductId INTEGER NOT NULL,
+        quantityNeeded INTEGER NOT NULL DEFAULT 1
+      );
+      CREATE TABLE invoices (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, clientId INTEGER, invoiceNumber TEXT,
+        invoiceDate TEXT, paymentStatus TEXT, total REAL
+      );
+      INSERT INTO items (id, name, price) VALUES (1, 'Basket', 20), (2, 'Ribbon', 1);
+      INSERT INTO item_components (itemId, inventoryProductId, quantityNeeded) VALUES (1, 2, 3);
+      INSERT INTO invoices (invoiceNumber, total) VALUES ('INV-2024-001', 60);
+    `);
+
+    await runMigrations(db);
+
+    const components = await db.all('SELECT parentItemId, componentItemId, quantityNeeded, includeInCost FROM item_components');
+    expect(components).toEqual([{ parentItemId: 1, componentItemId: 2, quantityNeeded: 3, includeInCost: 1 }]);
+
+    const invoice = await db.get('SELECT total, shipping FROM invoices');
+    expect(invoice.total).toBe(60);
+    expect(invoice.shipping).toBe(0);
+
+    const item = await db.get('SELECT cost, inventory, active FROM items WHERE id = 1');
+    expect(item).toEqual({ cost: 0, inventory: 0, active: 1 });
+  });
+
+  test('duplicate invoice numbers skip the unique index instead of failing', async () => {
+    // Possible on old databases after the invoice sequence was reset in Settings
+    await db.exec(`
+      CREATE TABLE invoices (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, clientId INTEGER, invoiceNumber TEXT,
+        invoiceDate TEXT, paymentStatus TEXT, total REAL
+      );
+      INSERT INTO invoices (invoiceNumber, total) VALUES ('INV-2024-001', 60), ('INV-2024-001', 75), ('INV-2024-002', 10);
+    `);
+    const warnSpy = jest.spyOn(console, 'warn').mockImplementation(() => {});
+
+    try {
+      await runMigrations(db);
+      expect(warnSpy).toHaveBeenCalledWith(expect.stringMatching(/INV-2024-001/));
+    } finally {
+      warnSpy.mockRestore();
+    }
+
+    expect(await getUserVersion()).toBe(LATEST_VERSION);
+    const invoices = await db.get('SELECT COUNT(*) as count FROM invoices');
+    expect(invoices.count).toBe(3);
+
+    const indexes = (await db.all('PRAGMA index_list(invoices)')).map(i => i.name);
+    expect(indexes).not.toContain('idx_invoices_invoiceNumber');
+    expect(indexes).toContain('idx_invoices_invoiceDate');
+  });
+
+  test('only pending migrations run on a partially migrated database', async () => {
+    await runMigrations(db);
+    await db.exec('PRAGMA user_version = 1');
+
+    const result = await runMigrations(db);
+
+    expect(result.from).toBe(1);
+    expect(result.applied).not.toContain(1);
+    expect(await getUserVersion()).toBe(LATEST_VERSION);
+  });
+});
@@ -0,0 +1,244 @@
+/**
+ * Invoice Creator - Invoice Archive
+ * Copyright (c) 2025 Blue Line Scannables
+ * All Rights Reserved - Proprietary Software
+ *
+ * Old, settled invoices are moved out of the main database into a separate
+ * SQLite file that is ATTACHed as "archive". This keeps the main database,
+ * its indexes and its WAL small. An existing archive is attached once at
+ * startup (initDb); otherwise it is created by the first archive run.
+ */
+const fs = require('fs');
+const { getArchiveDbPath } = require('./database');
+const { backfillInvoiceTotals } = require('./invoice-totals');
+
+// Tables that are moved to the archive (parents before children)
+const ARCHIVED_TABLES = ['invoices', 'invoice_items'];
+
+// Only invoices that can no longer change are archived
+const ARCHIVABLE_STATUSES = ['paid', 'voided'];
+
+// One attach in flight per connection
+const attachPromises = new WeakMap();
+// Connections the archive has been attached to and synced on
+const attachedConnections = new WeakSet();
+
+function archiveExists() {
+  return fs.existsSync(getArchiveDbPath());
+}
+
+async function isInDatabaseList(db) {
+  const databases = await db.all('PRAGMA database_list');
+  return databases.some(d => d.name === 'archive');
+}
+
+// Helper: Create the archive copy of a table, or add columns the main table
+// has gained since the archive was created (schema migrations only touch main)
+async function syncArchiveTable(db, table) {
+  const mainColumns = await db.all(`PRAGMA main.table_info(${table})`);
+  const archiveColumns = await db.all(`PRAGMA archive.table_info(${table})`);
+
+  if (archiveColumns.length === 0) {
+    const columnDefs = mainColumns.map(col =>
+      col.name === 'id' ? 'id INTEGER PRIMARY KEY' : `${col.name} ${col.type}`
+    );
+    await db.exec(`CREATE TABLE archive.${table} (${columnDefs.join(', ')})`);
+    return;
+  }
+
+  const existing = new Set(archiveColumns.map(col => col.name));
+  for (const col of mainColumns) {
+    if (!existing.has(col.name)) {
+      await db.exec(`ALTER TABLE archive.${table} ADD COLUMN ${col.name} ${col.type}`);
+    }
+  }
+}
+
+// Helper: Bring the archive schema in line with main. PRAGMA archive.user_version
+// records the main schema version it was last synced to, so on a normal launch
+// this is two PRAGMA reads; the table sync only runs after main has migrated.
+async function syncArchiveSchema(db) {
+  const { user_version: mainVersion } = await db.get('PRAGMA main.user_version');
+  const { user_version: archiveVersion } = await db.get('PRAGMA archive.user_version');
+  if (archiveVersion > 0 && archiveVersion >= mainVersion) {
+    return false;
+  }
+
+  await db.run('BEGIN IMMEDIATE');
+  try {
+    for (const table of ARCHIVED_TABLES) {
+      await syncArchiveTable(db, table);
+    }
+    await db.exec(`
+      CREATE INDEX IF NOT EXISTS archive.idx_invoices_clientId ON invoices(clientId);
+      CREATE INDEX IF NOT EXISTS archive.idx_invoices_invoiceNumber ON invoices(invoiceNumber);
+      CREATE INDEX IF NOT EXISTS archive.idx_invoices_invoiceDate ON invoices(invoiceDate);
+      CREATE INDEX IF NOT EXISTS archive.idx_invoice_items_invoiceId ON invoice_items(invoiceId);
+      CREATE INDEX IF NOT EXISTS archive.idx_invoice_items_itemId ON invoice_items(itemId);
+      CREATE INDEX IF NOT EXISTS archive.idx_invoices_report ON invoices(
+        invoiceDate, paymentStatus, total, subtotal, taxableSubtotal, tax, cogs, sellingFees, shipping
+      );
+    `);
+    // Rows archived before stored totals existed. Runs with the sync rather than
+    // on every attach - finding NULL totals means scanning the whole archive.
+    await backfillInvoiceTotals(db, 'archive');
+    // PRAGMA values can't be bound as parameters; version is a trusted integer
+    await db.exec(`PRAGMA archive.user_version = ${mainVersion}`);
+    await db.run('COMMIT');
+  } catch (error) {
+    await db.run('ROLLBACK');
+    throw error;
+  }
+  return true;
+}
+
+// Attach the archive database, creating it if needed.
+// Must not be called while a transaction is open (SQLite forbids ATTACH there).
+async function attachArchive(db) {
+  if (attachPromises.has(db)) {
+    return attachPromises.get(db);
+  }
+
+  const attaching = (async () => {
+    if (!(await isInDatabaseList(db))) {
+      await db.run('ATTACH DATABASE ? AS archive', [getArchiveDbPath()]);
+    }
+    await syncArchiveSchema(db);
+  })();
+
+  attachPromises.set(db, attaching);
+  try {
+    await attaching;
+    attachedConnections.add(db);
+  } catch (error) {
+    attachPromises.delete(db);
+    throw error;
+  }
+}
+
+// Attach the archive only if one has been created. Returns whether it is available.
+// Called from initDb() before any request is served, so the ATTACH and the schema
+// sync never run inside another request's transaction.
+async function attachArchiveIfExists(db) {
+  if (!attachPromises.has(db) && !archiveExists()) {
+    return false;
+  }
+  await attachArchive(db);
+  return true;
+}
+
+// Whether the archive is attached to this connection. Read paths use this
+// instead of attaching themselves, so they never touch the schema mid-request.
+function isArchiveAvailable(db) {
+  return attachedConnections.has(db);
+}
+
+// Get the invoiceDate cutoff for a given age in days (YYYY-MM-DD)
+function getArchiveCutoffDate(olderThanDays, now = new Date()) {
+  const cutoff = new Date(now);
+  cutoff.setDate(cutoff.getDate() - olderThanDays);
+  return cutoff.toISOString().split('T')[0];
+}
+
+// Move paid/voided invoices dated before the cutoff, and their line items,
+// into the archive database.
+//
+// In WAL mode SQLite does not commit atomically across attached databases, and
+// requests share one connection, so an invoice can be edited between steps.
+// The move therefore runs as three transactions:
+//   1. copy the archivable invoices and lines into the archive and commit;
+//   2. delete from main only invoices whose archive copy still matches the main
+//      row and all of its lines, and only lines whose own id was copied;
+//   3. drop archive copies of anything still in main (edited after the copy, or
+//      left behind by an interrupted run) - main stays the source of truth.
+// A crash at any point leaves a row in both databases, never in neither.
+async function archiveInvoices(db, olderThanDays) {
+  const cutoffDate = getArchiveCutoffDate(olderThanDays);
+  // Attach (and create) before any transaction - ATTACH is not allowed inside one
+  await attachArchive(db);
+
+  const statusList = ARCHIVABLE_STATUSES.map(() => '?').join(', ');
+  const archivableIds = `SELECT id FROM main.invoices WHERE invoiceDate < ? AND paymentStatus IN (${statusList})`;
+  const params = [cutoffDate, ...ARCHIVABLE_STATUSES];
+
+  const invoiceColumns = (await db.all('PRAGMA main.table_info(invoices)')).map(c => c.name);
+  const itemColumns = (await db.all('PRAGMA main.table_info(invoice_items)')).map(c => c.name);
+  const sameRow = (columns, a, b) => columns.map(c => `${a}.${c} IS ${b}.${c}`).join(' AND ');
+
+  await db.run('BEGIN IMMEDIATE');
+  try {
+    await db.run(
+      `INSERT OR REPLACE INTO archive.invoices (${invoiceColumns.join(', ')})
+       SELECT ${invoiceColumns.join(', ')} FROM main.invoices WHERE id IN (${archivableIds})`,
+      params
+    );
+    await db.run(
+      `INSERT OR REPLACE INTO archive.invoice_items (${itemColumns.join(', ')})
+       SELECT ${itemColumns.join(', ')} FROM main.invoice_items WHERE invoiceId IN (${archivableIds})`,
+      params
+    );
+    await db.run('COMMIT');
+  } catch (error) {
+    await db.run('ROLLBACK');
+    throw error;
+  }
+
+  let invoices;
+  let items;
+  await db.run('BEGIN IMMEDIATE');
+  try {
+    await db.exec(`
+      CREATE TEMP TABLE IF NOT EXISTS archive_moved (id INTEGER PRIMARY KEY);
+      DELETE FROM temp.archive_moved;
+    `);
+    // Unchanged since the copy: same invoice row, every main line copied as-is,
+    // and no archived line that main has since dropped
+    await db.run(
+      `INSERT INTO temp.archive_moved (id)
+       SELECT m.id FROM main.invoices m
+       WHERE m.id IN (${archivableIds})
+         AND EXISTS (SELECT 1 FROM archive.invoices a WHERE a.id = m.id AND ${sameRow(invoiceColumns, 'a', 'm')})
+         AND NOT EXISTS (
+           SELECT 1 FROM main.invoice_items mi WHERE mi.invoiceId = m.id
+             AND NOT EXISTS (SELECT 1 FROM archive.invoice_items ai WHERE ai.id = mi.id AND ${sameRow(itemColumns, 'ai', 'mi')})
+         )
+         AND NOT EXISTS (
+           SELECT 1 FROM archive.invoice_items ai WHERE ai.invoiceId = m.id
+             AND NOT EXISTS (SELECT 1 FROM main.invoice_items mi WHERE mi.id = ai.id)
+         )`,
+      params
+    );
+    items = await db.run(
+      `DELETE FROM main.invoice_items
+       WHERE invoiceId IN (SELECT id FROM temp.archive_moved)
+         AND EXISTS (SELECT 1 FROM archive.invoice_items ai WHERE ai.id = main.invoice_items.id)`
+    );
+    invoices = await db.run('DELETE FROM main.invoices WHERE id IN (SELECT id FROM temp.archive_moved)');
+    await db.run('COMMIT');
+  } catch (error) {
+    await db.run('ROLLBACK');
+    throw error;
+  }
+
+  await db.run('BEGIN IMMEDIATE');
+  try {
+    await db.run('DELETE FROM archive.invoice_items WHERE invoiceId IN (SELECT id FROM main.invoices)');
+    await db.run('DELETE FROM archive.invoices WHERE id IN (SELECT id FROM main.invoices)');
+    await db.run('COMMIT');
+  } catch (error) {
+    await db.run('ROLLBACK');
+    throw error;
+  }
+
+  return { cutoffDate, invoices: invoices.changes, items: items.changes };
+}
+
+module.exports = {
+  ARCHIVABLE_STATUSES,
+  archiveExists,
+  attachArchive,
+  attachArchiveIfExists,
+  isArchiveAvailable,
+  getArchiveCutoffDate,
+  archiveInvoices
+};
@@ -27,6 +27,14 @@ function getDbPath() {
   return path.join(__dirname, 'database.db');
 }
 
+// Get archive database path (sits next to the main database)
+// e.g. database.db -> database-archive.db
+function getArchiveDbPath() {
+  const dbPath = getDbPath();
+  const ext = path.extname(dbPath);
+  return path.join(path.dirname(dbPath), `${path.basename(dbPath, ext)}-archive${ext}`);
+}
+
 async function openDb() {
   if (dbInstance) {
     return dbInstance;
@@ -46,4 +54,4 @@ async function openDb() {
   return dbInstance;
 }
 
-module.exports = { openDb, getDbPath };
+module.exports = { openDb, getDbPath, getArchiveDbPath };
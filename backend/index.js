@@ -2,7 +2,9 @@ const express = require('express');
 const cors = require('cors');
 const path = require('path');
 const { openDb } = require('./database');
-require('./init-db'); // Initialize database tables on startup
+const { initDb } = require('./init-db');
+const { isArchiveAvailable, archiveInvoices } = require('./archive');
+const { calculateItemCost, computeInvoiceTotals, backfillInvoiceTotals } = require('./invoice-totals');
 const app = express();
 const port = process.env.PORT || 3001;
 
@@ -60,8 +62,12 @@ app.put('/settings', async (req, res) => {
     businessName, businessStreet, businessStreet2, businessCity,
     businessState, businessZip, businessPhone, businessEmail,
     taxRate, bannerImage, invoiceNumberPrefix, invoiceNumberNextSequence,
-    defaultPaymentTerms, sellingFeePercent, sellingFeeFixed
+    defaultPaymentTerms, sellingFeePercent, sellingFeeFixed, archiveAfterDays
   } = req.body;
+  if (archiveAfterDays != null) {
+    const daysError = validatePositiveInteger(archiveAfterDays, 'Archive age');
+    if (daysError) return res.status(400).json({ message: daysError });
+  }
   const db = await openDb();
   await db.run(
     `UPDATE settings SET
@@ -69,12 +75,13 @@ app.put('/settings', async (req, res) => {
       businessCity = ?, businessState = ?, businessZip = ?,
       businessPhone = ?, businessEmail = ?, taxRate = ?, bannerImage = ?,
       invoiceNumberPrefix = ?, invoiceNumberNextSequence = ?,
-      defaultPaymentTerms = ?, sellingFeePercent = ?, sellingFeeFixed = ?
+      defaultPaymentTerms = ?, sellingFeePercent = ?, sellingFeeFixed = ?,
+      archiveAfterDays = COALESCE(?, archiveAfterDays)
     WHERE id = 1`,
     [businessName, businessStreet, businessStreet2, businessCity,
      businessState, businessZip, businessPhone, businessEmail, taxRate, bannerImage,
      invoiceNumberPrefix, invoiceNumberNextSequence, defaultPaymentTerms,
-     sellingFeePercent, sellingFeeFixed]
+     sellingFeePercent, sellingFeeFixed, archiveAfterDays != null ? parseInt(archiveAfterDays) : null]
   );
   res.json({ message: 'Settings updated' });
 });
@@ -145,6 +152,10 @@ app.delete('/clients/:id', async (req, res) => {
     const db = await openDb();
     // Check if client has any invoices
     const invoiceCount = await db.get('SELECT COUNT(*) as count FROM invoices WHERE clientId = ?', [id]);
+    if (isArchiveAvailable(db)) {
+      const archived = await db.get('SELECT COUNT(*) as count FROM archive.invoices WHERE clientId = ?', [id]);
+      invoiceCount.count += archived.count;
+    }
     if (invoiceCount.count > 0) {
       return res.status(400).json({
         message: `Cannot delete: this client has ${invoiceCount.count} invoice(s). Delete or reassign invoices first.`
@@ -158,35 +169,6 @@ app.delete('/clients/:id', async (req, res) => {
   }
 });
 
-// Helper: Calculate item cost from components (recursive)
-// Only includes components where includeInCost = 1 (or NULL for backwards compatibility)
-async function calculateItemCost(db, itemId, visited = new Set()) {
-  // Prevent infinite loops from circular references
-  if (visited.has(itemId)) return 0;
-  visited.add(itemId);
-
-  const components = await db.all(
-    'SELECT componentItemId, quantityNeeded, includeInCost FROM item_components WHERE parentItemId = ?',
-    [itemId]
-  );
-
-  if (components.length === 0) {
-    // No components - use item's own cost
-    const item = await db.get('SELECT cost FROM items WHERE id = ?', [itemId]);
-    return item ? parseFloat(item.cost) || 0 : 0;
-  }
-
-  // Sum up component costs (only those marked as includeInCost)
-  let totalCost = 0;
-  for (const comp of components) {
-    // Include if includeInCost is 1 or NULL (backwards compatibility)
-    if (comp.includeInCost === 0) continue;
-    const componentCost = await calculateItemCost(db, comp.componentItemId, new Set(visited));
-    totalCost += componentCost * comp.quantityNeeded;
-  }
-  return totalCost;
-}
-
 // Item routes - unified system where everything is an item
 app.get('/items', async (req, res) => {
   try {
@@ -322,6 +304,10 @@ app.delete('/items/:id', async (req, res) => {
 
     // Check if item is used in any invoices
     const invoiceCount = await db.get('SELECT COUNT(*) as count FROM invoice_items WHERE itemId = ?', [id]);
+    if (isArchiveAvailable(db)) {
+      const archived = await db.get('SELECT COUNT(*) as count FROM archive.invoice_items WHERE itemId = ?', [id]);
+      invoiceCount.count += archived.count;
+    }
     if (invoiceCount.count > 0) {
       return res.status(400).json({
         message: `Cannot delete: this item is used in ${invoiceCount.count} invoice(s).`
@@ -440,26 +426,69 @@ app.post('/items/quick-component', async (req, res) => {
 
 
 // Invoice routes
+// Pass ?includeArchived=true (invoice list toggle, dashboard, reports, backup) to span the archive database too
 app.get('/invoices', async (req, res) => {
-  const db = await openDb();
-  const invoices = await db.all(`
-    SELECT i.id, i.invoiceNumber, i.invoiceDate, i.dueDate, i.paymentStatus,
-           i.amountPaid, i.paymentDate, i.createdAt, i.total, c.name as clientName
-    FROM invoices i
-    LEFT JOIN clients c ON i.clientId = c.id
-    ORDER BY i.id DESC
-  `);
-  res.json(invoices);
+  try {
+    const db = await openDb();
+    const includeArchived = req.query.includeArchived === 'true' && isArchiveAvailable(db);
+    const listQuery = (schema, archived) => `
+      SELECT i.id, i.invoiceNumber, i.invoiceDate, i.dueDate, i.paymentStatus,
+             i.amountPaid, i.paymentDate, i.createdAt, i.total, i.shipping,
+             i.subtotal, i.taxableSubtotal, i.tax, i.cogs, i.sellingFees,
+             c.name as clientName, ${archived} as archived
+      FROM ${schema}.invoices i
+      LEFT JOIN clients c ON i.clientId = c.id
+    `;
+    const invoices = await db.all(`
+      ${listQuery('main', 0)}
+      ${includeArchived ? `UNION ALL ${listQuery('archive', 1)}` : ''}
+      ORDER BY id DESC
+    `);
+    res.json(invoices);
+  } catch (error) {
+    console.error('Error loading invoices:', error);
+    res.status(500).json({ message: 'Failed to load invoices' });
+  }
+});
+
+// Archive paid/voided invoices older than olderThanDays (defaults to the archiveAfterDays setting)
+app.post('/invoices/archive', async (req, res) => {
+  try {
+    const db = await openDb();
+    let { olderThanDays } = req.body || {};
+    if (olderThanDays === undefined) {
+      const settings = await db.get('SELECT archiveAfterDays FROM settings WHERE id = 1');
+      olderThanDays = settings.archiveAfterDays ?? 365;
+    }
+    const daysError = validatePositiveInteger(olderThanDays, 'Archive age');
+    if (daysError) return res.status(400).json({ message: daysError });
+
+    const result = await archiveInvoices(db, parseInt(olderThanDays));
+    res.json({
+      message: `Archived ${result.invoices} invoice(s) dated before ${result.cutoffDate}`,
+      ...result
+    });
+  } catch (error) {
+    console.error('Error archiving invoices:', error);
+    res.status(500).json({ message: 'Failed to archive invoices' });
+  }
 });
 
 app.get('/invoices/:id', async (req, res) => {
   const { id } = req.params;
   const db = await openDb();
-  const invoice = await db.get('SELECT * FROM invoices WHERE id = ?', [id]);
+  let schema = 'main';
+  let invoice = await db.get('SELECT * FROM main.invoices WHERE id = ?', [id]);
+  // Fall back to the archive - archived invoices are read-only
+  if (!invoice && isArchiveAvailable(db)) {
+    schema = 'archive';
+    invoice = await db.get('SELECT * FROM archive.invoices WHERE id = ?', [id]);
+  }
   if (invoice) {
+    invoice.archived = schema === 'archive' ? 1 : 0;
     invoice.items = await db.all(`
-      SELECT ii.*, it.name as itemName, it.cost as itemCost
-      FROM invoice_items ii
+      SELECT ii.*, it.name as itemName, COALESCE(ii.unitCost, it.cost) as itemCost
+      FROM ${schema}.invoice_items ii
       LEFT JOIN items it ON ii.itemId = it.id
       WHERE ii.invoiceId = ?
     `, [id]);
@@ -523,6 +552,22 @@ async function checkInventory(db, itemId, quantity, itemName) {
   }
 }
 
+// Helper: Attach the current unit cost to each invoice line (snapshot at time of sale)
+// savedCosts (itemId -> unitCost) keeps the original snapshot for items already on an edited invoice
+async function costInvoiceLines(db, items, savedCosts = new Map()) {
+  const lines = [];
+  for (const item of items) {
+    let unitCost = 0;
+    if (savedCosts.has(item.itemId)) {
+      unitCost = savedCosts.get(item.itemId);
+    } else if (item.itemId) {
+      unitCost = await calculateItemCost(db, item.itemId);
+    }
+    lines.push({ ...item, unitCost });
+  }
+  return lines;
+}
+
 app.post('/invoices', async (req, res) => {
   const { clientId, items, total, invoiceDate, notes, shipping } = req.body;
   const db = await openDb();
@@ -568,11 +613,26 @@ app.post('/invoices', async (req, res) => {
       const year = new Date().getFullYear();
       const invoiceNumber = `${prefix}-${year}-${String(seq).padStart(3, '0')}`;
 
+      // The unique index only covers main; numbers moved to the archive are still taken
+      if (isArchiveAvailable(db)) {
+        const archived = await db.get('SELECT 1 FROM archive.invoices WHERE invoiceNumber = ?', [invoiceNumber]);
+        if (archived) {
+          await db.run('ROLLBACK');
+          return res.status(400).json({ message: 'Invoice number conflict. Please try again.' });
+        }
+      }
+
+      // Snapshot line costs and compute stored totals
+      const lines = await costInvoiceLines(db, items);
+      const totals = computeInvoiceTotals(lines, settings, { total, shipping });
+
       // Insert invoice
       const result = await db.run(
-        `INSERT INTO invoices (clientId, total, invoiceDate, invoiceNumber, dueDate, paymentStatus, amountPaid, notes, shipping)
-         VALUES (?, ?, ?, ?, ?, 'unpaid', 0, ?, ?)`,
-        [clientId, total, invDate, invoiceNumber, dueDate, notes || null, shipping || 0]
+        `INSERT INTO invoices (clientId, total, invoiceDate, invoiceNumber, dueDate, paymentStatus, amountPaid, notes, shipping,
+                               subtotal, taxableSubtotal, tax, cogs, sellingFees)
+         VALUES (?, ?, ?, ?, ?, 'unpaid', 0, ?, ?, ?, ?, ?, ?, ?)`,
+        [clientId, total, invDate, invoiceNumber, dueDate, notes || null, shipping || 0,
+         totals.subtotal, totals.taxableSubtotal, totals.tax, totals.cogs, totals.sellingFees]
       );
       const invoiceId = result.lastID;
 
@@ -580,10 +640,10 @@ app.post('/invoices', async (req, res) => {
       await db.run('UPDATE settings SET invoiceNumberNextSequence = ? WHERE id = 1', [seq + 1]);
 
       // Insert invoice items and decrement inventory
-      for (const item of items) {
+      for (const item of lines) {
         await db.run(
-          'INSERT INTO invoice_items (invoiceId, itemId, quantity, price, taxExempt) VALUES (?, ?, ?, ?, ?)',
-          [invoiceId, item.itemId, item.quantity, item.price, item.taxExempt ? 1 : 0]
+          'INSERT INTO invoice_items (invoiceId, itemId, quantity, price, taxExempt, unitCost) VALUES (?, ?, ?, ?, ?, ?)',
+          [invoiceId, item.itemId, item.quantity, item.price, item.taxExempt ? 1 : 0, item.unitCost]
         );
 
         // Decrement inventory (recursively handles components)
@@ -635,7 +695,7 @@ app.put('/invoices/:id', async (req, res) => {
 
   try {
     // Check if invoice exists and is not voided
-    const existingInvoice = await db.get('SELECT paymentStatus, total FROM invoices WHERE id = ?', [id]);
+    const existingInvoice = await db.get('SELECT paymentStatus, total, subtotal, sellingFees FROM invoices WHERE id = ?', [id]);
     if (!existingInvoice) {
       return res.status(404).json({ message: 'Invoice not found' });
     }
@@ -656,9 +716,13 @@ app.put('/invoices/:id', async (req, res) => {
 
     try {
       // Restore inventory from old items first
-      const oldItems = await db.all('SELECT itemId, quantity FROM invoice_items WHERE invoiceId = ?', [id]);
+      const oldItems = await db.all('SELECT itemId, quantity, unitCost FROM invoice_items WHERE invoiceId = ?', [id]);
+      const savedCosts = new Map();
       for (const oldItem of oldItems) {
         await restoreInventory(db, oldItem.itemId, oldItem.quantity);
+        if (oldItem.itemId && oldItem.unitCost != null) {
+          savedCosts.set(oldItem.itemId, oldItem.unitCost);
+        }
       }
 
       // Check inventory for new items
@@ -691,20 +755,32 @@ app.put('/invoices/:id', async (req, res) => {
         newPaymentDate = currentInv.paymentDate;
       }
 
+      // Recompute stored totals. Lines already on the invoice keep the cost they were
+      // sold at; only newly added items are costed at today's figures.
+      const settings = await db.get('SELECT taxRate, sellingFeePercent, sellingFeeFixed FROM settings WHERE id = 1');
+      const lines = await costInvoiceLines(db, items, savedCosts);
+      const totals = computeInvoiceTotals(lines, settings, { total, shipping });
+      // Fees were charged on the original sale; only re-price them if the subtotal changed
+      if (existingInvoice.sellingFees != null && totals.subtotal === existingInvoice.subtotal) {
+        totals.sellingFees = existingInvoice.sellingFees;
+      }
+
       // Update invoice
       await db.run(
         `UPDATE invoices SET clientId = ?, total = ?, invoiceDate = ?, dueDate = ?,
-         paymentStatus = ?, amountPaid = ?, notes = ?, paymentDate = ?, shipping = ? WHERE id = ?`,
-        [clientId, total, invoiceDate, dueDate, paymentStatus || 'unpaid', finalAmountPaid, notes || null, newPaymentDate, shipping || 0, id]
+         paymentStatus = ?, amountPaid = ?, notes = ?, paymentDate = ?, shipping = ?,
+         subtotal = ?, taxableSubtotal = ?, tax = ?, cogs = ?, sellingFees = ? WHERE id = ?`,
+        [clientId, total, invoiceDate, dueDate, paymentStatus || 'unpaid', finalAmountPaid, notes || null, newPaymentDate, shipping || 0,
+         totals.subtotal, totals.taxableSubtotal, totals.tax, totals.cogs, totals.sellingFees, id]
       );
 
       // Replace invoice items
       await db.run('DELETE FROM invoice_items WHERE invoiceId = ?', [id]);
 
-      for (const item of items) {
+      for (const item of lines) {
         await db.run(
-          'INSERT INTO invoice_items (invoiceId, itemId, quantity, price, taxExempt) VALUES (?, ?, ?, ?, ?)',
-          [id, item.itemId, item.quantity, item.price, item.taxExempt ? 1 : 0]
+          'INSERT INTO invoice_items (invoiceId, itemId, quantity, price, taxExempt, unitCost) VALUES (?, ?, ?, ?, ?, ?)',
+          [id, item.itemId, item.quantity, item.price, item.taxExempt ? 1 : 0, item.unitCost]
         );
         await decrementInventory(db, item.itemId, item.quantity);
       }
@@ -852,12 +928,125 @@ app.delete('/invoices/:id', async (req, res) => {
   }
 });
 
+// Report: quantity, revenue and cost of goods per item across non-voided invoices
+// Optional from/to (YYYY-MM-DD) filter on invoiceDate; includeArchived=true spans the archive
+app.get('/reports/item-sales', async (req, res) => {
+  const { from, to } = req.query;
+  try {
+    const db = await openDb();
+    const includeArchived = req.query.includeArchived === 'true' && isArchiveAvailable(db);
+
+    const conditions = ["inv.paymentStatus != 'voided'"];
+    const params = [];
+    if (from) {
+      conditions.push('substr(inv.invoiceDate, 1, 10) >= ?');
+      params.push(from);
+    }
+    if (to) {
+      conditions.push('substr(inv.invoiceDate, 1, 10) <= ?');
+      params.push(to);
+    }
+    const linesQuery = (schema) => `
+      SELECT ii.invoiceId, ii.itemId, ii.quantity, ii.price, ii.unitCost
+      FROM ${schema}.invoice_items ii
+      JOIN ${schema}.invoices inv ON ii.invoiceId = inv.id
+      WHERE ${conditions.join(' AND ')}
+    `;
+
+    const rows = await db.all(`
+      SELECT it.name as itemName,
+             SUM(l.quantity) as qty,
+             SUM(l.quantity * l.price) as revenue,
+             SUM(l.quantity * COALESCE(l.unitCost, 0)) as cost,
+             COUNT(DISTINCT l.invoiceId) as invoiceCount
+      FROM (
+        ${linesQuery('main')}
+        ${includeArchived ? `UNION ALL ${linesQuery('archive')}` : ''}
+      ) l
+      LEFT JOIN items it ON l.itemId = it.id
+      GROUP BY l.itemId
+    `, includeArchived ? [...params, ...params] : params);
+    res.json(rows);
+  } catch (error) {
+    console.error('Error loading item sales:', error);
+    res.status(500).json({ message: 'Failed to load item sales' });
+  }
+});
+
+// Report periods for /reports/summary, keyed on the YYYY-MM-DD prefix of invoiceDate
+const SUMMARY_PERIODS = {
+  all: "'all'",
+  month: 'substr(invoiceDate, 1, 7)',
+  quarter: "substr(invoiceDate, 1, 4) || '-Q' || ((CAST(substr(invoiceDate, 6, 2) AS INTEGER) + 2) / 3)",
+  year: 'substr(invoiceDate, 1, 4)'
+};
+
+// Report: stored invoice totals per period (all, month, quarter or year) across non-voided invoices
+// Optional from/to (YYYY-MM-DD) filter on invoiceDate; includeArchived=true spans the archive.
+// Reads only columns in idx_invoices_report, so SQLite answers it from the index alone.
+app.get('/reports/summary', async (req, res) => {
+  const { from, to, period = 'all' } = req.query;
+  const periodExpr = SUMMARY_PERIODS[period];
+  if (!periodExpr) {
+    return res.status(400).json({ message: `Period must be one of: ${Object.keys(SUMMARY_PERIODS).join(', ')}` });
+  }
+
+  try {
+    const db = await openDb();
+    const includeArchived = req.query.includeArchived === 'true' && isArchiveAvailable(db);
+
+    // Plain range comparisons on invoiceDate so the index can be searched
+    const conditions = ["paymentStatus IS NOT 'voided'"];
+    const params = [];
+    if (from) {
+      conditions.push('invoiceDate >= ?');
+      params.push(from);
+    }
+    if (to) {
+      conditions.push("invoiceDate < date(?, '+1 day')");
+      params.push(to);
+    }
+    const rowsQuery = (schema) => `
+      SELECT invoiceDate, paymentStatus, total, subtotal, taxableSubtotal, tax, cogs, sellingFees
+      FROM ${schema}.invoices
+      WHERE ${conditions.join(' AND ')}
+    `;
+
+    const rows = await db.all(`
+      SELECT ${periodExpr} as period,
+             COUNT(*) as invoiceCount,
+             SUM(paymentStatus = 'paid') as paidCount,
+             TOTAL(total) as revenue,
+             TOTAL(CASE WHEN paymentStatus = 'paid' THEN total END) as collected,
+             TOTAL(subtotal) as subtotal,
+             TOTAL(taxableSubtotal) as taxableSubtotal,
+             TOTAL(tax) as tax,
+             TOTAL(CASE WHEN paymentStatus = 'paid' THEN tax END) as paidTax,
+             TOTAL(cogs) as cogs,
+             TOTAL(sellingFees) as sellingFees
+      FROM (
+        ${rowsQuery('main')}
+        ${includeArchived ? `UNION ALL ${rowsQuery('archive')}` : ''}
+      )
+      GROUP BY period
+      ORDER BY period DESC
+    `, includeArchived ? [...params, ...params] : params);
+    res.json(rows);
+  } catch (error) {
+    console.error('Error loading report summary:', error);
+    res.status(500).json({ message: 'Failed to load report summary' });
+  }
+});
+
 // Full data restore from backup
 app.post('/restore', async (req, res) => {
   const { settings, clients, items, inventoryProducts, invoices } = req.body;
   const db = await openDb();
 
   try {
+    // Backups include archived invoices; they are restored into the main database
+    const hasArchive = isArchiveAvailable(db);
+
     await db.run('BEGIN IMMEDIATE');
 
     try {
@@ -877,11 +1066,14 @@ app.post('/restore', async (req, res) => {
            settings.invoiceNumberPrefix, settings.invoiceNumberNextSequence,
            settings.defaultPaymentTerms, settings.sellingFeePercent, settings.sellingFeeFixed]
         );
+        if (settings.archiveAfterDays !== undefined) {
+          await db.run('UPDATE settings SET archiveAfterDays = ? WHERE id = 1', [settings.archiveAfterDays]);
+        }
       }
 
       // Clear existing data (in order due to foreign keys)
-      await db.run('DELETE FROM invoice_items');
-      await db.run('DELETE FROM invoices');
+      await db.run('DELETE FROM main.invoice_items');
+      await db.run('DELETE FROM main.invoices');
       await db.run('DELETE FROM items');
       await db.run('DELETE FROM inventory_products');
       await db.run('DELETE FROM clients');
@@ -920,30 +1112,52 @@ app.post('/restore', async (req, res) => {
       if (invoices && invoices.length > 0) {
         for (const invoice of invoices) {
           await db.run(
-            `INSERT INTO invoices (id, clientId, invoiceNumber, invoiceDate, dueDate, paymentStatus, amountPaid, paymentDate, total, notes, createdAt, shipping)
-             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)`,
+            `INSERT INTO invoices (id, clientId, invoiceNumber, invoiceDate, dueDate, paymentStatus, amountPaid, paymentDate, total, notes, createdAt, shipping,
+                                   subtotal, taxableSubtotal, tax, cogs, sellingFees)
+             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)`,
             [invoice.id, invoice.clientId, invoice.invoiceNumber, invoice.invoiceDate, invoice.dueDate,
-             invoice.paymentStatus, invoice.amountPaid || 0, invoice.paymentDate, invoice.total, invoice.notes, invoice.createdAt, invoice.shipping || 0]
+             invoice.paymentStatus, invoice.amountPaid || 0, invoice.paymentDate, invoice.total, invoice.notes, invoice.createdAt, invoice.shipping || 0,
+             invoice.subtotal ?? null, invoice.taxableSubtotal ?? null, invoice.tax ?? null, invoice.cogs ?? null, invoice.sellingFees ?? null]
           );
 
           // Restore invoice items
           if (invoice.items && invoice.items.length > 0) {
             for (const item of invoice.items) {
               await db.run(
-                'INSERT INTO invoice_items (invoiceId, itemId, quantity, price, taxExempt) VALUES (?, ?, ?, ?, ?)',
-                [invoice.id, item.itemId, item.quantity, item.price, item.taxExempt ? 1 : 0]
+                'INSERT INTO invoice_items (invoiceId, itemId, quantity, price, taxExempt, unitCost) VALUES (?, ?, ?, ?, ?, ?)',
+                [invoice.id, item.itemId, item.quantity, item.price, item.taxExempt ? 1 : 0, item.unitCost ?? null]
               );
             }
           }
         }
       }
 
+      // Older backups have no stored totals or cost snapshots
+      await backfillInvoiceTotals(db);
+
       await db.run('COMMIT');
-      res.json({ message: 'Data restored successfully' });
     } catch (error) {
       await db.run('ROLLBACK');
       throw error;
     }
+
+    // The old archive is cleared in its own transaction, only once main has committed:
+    // commits across attached databases aren't atomic in WAL mode. If this step is
+    // interrupted, the leftover copies share ids with restored main rows and the
+    // next archive run drops them.
+    if (hasArchive) {
+      await db.run('BEGIN IMMEDIATE');
+      try {
+        await db.run('DELETE FROM archive.invoice_items');
+        await db.run('DELETE FROM archive.invoices');
+        await db.run('COMMIT');
+      } catch (error) {
+        await db.run('ROLLBACK');
+        throw error;
+      }
+    }
+
+    res.json({ message: 'Data restored successfully' });
   } catch (error) {
     console.error('Error restoring data:', error);
     res.status(500).json({ message: 'Failed to restore data: ' + error.message });
@@ -955,12 +1169,22 @@ app.get('/{*splat}', (req, res) => {
   res.sendFile(path.join(frontendPath, 'index.html'));
 });
 
+// Apply pending schema migrations before accepting any requests
+const dbReady = initDb();
+
 // Only start server if not in test mode
 if (process.env.NODE_ENV !== 'test') {
-  app.listen(port, () => {
-    console.log(`Server is running on http://localhost:${port}`);
-  });
+  dbReady
+    .then(() => {
+      app.listen(port, () => {
+        console.log(`Server is running on http://localhost:${port}`);
+      });
+    })
+    .catch(error => {
+      console.error('Database initialization failed:', error);
+      process.exit(1);
+    });
 }
 
 // Export app for testing
-module.exports = { app };
+module.exports = { app, dbReady };
@@ -5,128 +5,57 @@
  * Build ID: BLS-IC-7X9K2M4P | Auth: 0x424C53
  */
 const { openDb } = require('./database');
+const { backfillInvoiceTotals } = require('./invoice-totals');
+const { attachArchiveIfExists } = require('./archive');
 const _dbSig = 'BLS-IC-' + (0x7E9).toString();
 
-async function initDb() {
-  const db = await openDb();
-
-  await db.exec(`
-    CREATE TABLE IF NOT EXISTS clients (
-      id INTEGER PRIMARY KEY AUTOINCREMENT,
-      name TEXT NOT NULL,
-      street TEXT,
-      street2 TEXT,
-      city TEXT,
-      state TEXT,
-      zip TEXT,
-      phone TEXT,
-      email TEXT
-    );
-
-    -- Unified items table: raw materials, products, bundles - everything is an item
-    -- Any item can be sold directly AND/OR used as a component of another item
-    CREATE TABLE IF NOT EXISTS items (
-      id INTEGER PRIMARY KEY AUTOINCREMENT,
-      name TEXT NOT NULL UNIQUE,
-      price REAL NOT NULL DEFAULT 0,
-      cost REAL DEFAULT 0,
-      inventory INTEGER DEFAULT 0,
-      reorderLevel INTEGER DEFAULT 0,
-      active INTEGER DEFAULT 1
-    );
-
-    -- Item components: items can contain other items (recursive/hierarchical)
-    -- Example: "Gift Basket" contains "Mirror" + "Candle x2" + "Basket"
-    -- And "Mirror" itself contains "Glass" + "Frame" + "Lights" etc.
-    CREATE TABLE IF NOT EXISTS item_components (
-      id INTEGER PRIMARY KEY AUTOINCREMENT,
-      parentItemId INTEGER NOT NULL,
-      componentItemId INTEGER NOT NULL,
-      quantityNeeded INTEGER NOT NULL DEFAULT 1,
-      includeInCost INTEGER DEFAULT 1,
-      FOREIGN KEY (parentItemId) REFERENCES items(id) ON DELETE CASCADE,
-      FOREIGN KEY (componentItemId) REFERENCES items(id) ON DELETE RESTRICT
-    );
-
-    CREATE TABLE IF NOT EXISTS invoices (
-      id INTEGER PRIMARY KEY AUTOINCREMENT,
-      clientId INTEGER,
-      invoiceNumber TEXT,
-      invoiceDate TEXT DEFAULT CURRENT_TIMESTAMP,
-      dueDate TEXT,
-      paymentStatus TEXT DEFAULT 'unpaid',
-      amountPaid REAL DEFAULT 0,
-      paymentDate TEXT,
-      notes TEXT,
-      createdAt TEXT DEFAULT CURRENT_TIMESTAMP,
-      total REAL,
-      FOREIGN KEY (clientId) REFERENCES clients(id)
-    );
-
-    CREATE TABLE IF NOT EXISTS invoice_items (
-      id INTEGER PRIMARY KEY AUTOINCREMENT,
-      invoiceId INTEGER,
-      itemId INTEGER,
-      quantity INTEGER NOT NULL,
-      price REAL NOT NULL,
-      taxExempt INTEGER DEFAULT 0,
-      FOREIGN KEY (invoiceId) REFERENCES invoices(id),
-      FOREIGN KEY (itemId) REFERENCES items(id)
-    );
-
-    CREATE TABLE IF NOT EXISTS settings (
-      id INTEGER PRIMARY KEY CHECK (id = 1),
-      businessName TEXT DEFAULT 'Your Business Name',
-      businessStreet TEXT DEFAULT '',
-      businessStreet2 TEXT DEFAULT '',
-      businessCity TEXT DEFAULT '',
-      businessState TEXT DEFAULT '',
-      businessZip TEXT DEFAULT '',
-      businessPhone TEXT DEFAULT '',
-      businessEmail TEXT DEFAULT '',
-      taxRate REAL DEFAULT 0.08,
-      bannerImage TEXT DEFAULT '',
-      invoiceNumberPrefix TEXT DEFAULT 'INV',
-      invoiceNumberNextSequence INTEGER DEFAULT 1,
-      defaultPaymentTerms INTEGER DEFAULT 30,
-      sellingFeePercent REAL DEFAULT 0,
-      sellingFeeFixed REAL DEFAULT 0
-    );
-
-    INSERT OR IGNORE INTO settings (id) VALUES (1);
-  `);
-
-  // Add columns if they don't exist (for schema updates)
-  const columnsToAdd = [
-    { table: 'items', column: 'active', type: 'INTEGER DEFAULT 1' },
-    { table: 'items', column: 'cost', type: 'REAL DEFAULT 0' },
-    { table: 'items', column: 'inventory', type: 'INTEGER DEFAULT 0' },
-    { table: 'items', column: 'reorderLevel', type: 'INTEGER DEFAULT 0' },
-    { table: 'item_components', column: 'includeInCost', type: 'INTEGER DEFAULT 1' },
-    { table: 'invoices', column: 'shipping', type: 'REAL DEFAULT 0' },
-  ];
-
-  for (const { table, column, type } of columnsToAdd) {
-    try {
-      await db.exec(`ALTER TABLE ${table} ADD COLUMN ${column} ${type}`);
-    } catch (e) { /* column already exists */ }
+// Helper: Add a column only if the table doesn't already have it
+async function addColumnIfMissing(db, table, column, type) {
+  const tableInfo = await db.all(`PRAGMA table_info(${table})`);
+  if (!tableInfo.some(col => col.name === column)) {
+    await db.exec(`ALTER TABLE ${table} ADD COLUMN ${column} ${type}`);
   }
+}
 
-  // Migration: Rename old item_components columns if they exist
-  // Old schema had: itemId, inventoryProductId
-  // New schema has: parentItemId, componentItemId
-  try {
-    const tableInfo = await db.all(`PRAGMA table_info(item_components)`);
-    console.log('Migration check - columns found:', tableInfo.map(c => c.name).join(', '));
-    const hasOldColumns = tableInfo.some(col => col.name === 'itemId' || col.name === 'inventoryProductId');
-    console.log('Has old columns?', hasOldColumns);
+// Numbered schema migrations. The database records the last applied version in
+// PRAGMA user_version, so each migration runs exactly once per database file.
+// Never edit a migration that has shipped - append a new one instead.
+const migrations = [
+  {
+    version: 1,
+    description: 'Base schema',
+    // Written to be safe on databases created before versioning existed
+    // (user_version = 0 but tables already present)
+    async up(db) {
+      await db.exec(`
+        CREATE TABLE IF NOT EXISTS clients (
+          id INTEGER PRIMARY KEY AUTOINCREMENT,
+          name TEXT NOT NULL,
+          street TEXT,
+          street2 TEXT,
+          city TEXT,
+          state TEXT,
+          zip TEXT,
+          phone TEXT,
+          email TEXT
+        );
 
-    if (hasOldColumns) {
-      console.log('>>> MIGRATING item_components table to new schema...');
+        -- Unified items table: raw materials, products, bundles - everything is an item
+        -- Any item can be sold directly AND/OR used as a component of another item
+        CREATE TABLE IF NOT EXISTS items (
+          id INTEGER PRIMARY KEY AUTOINCREMENT,
+          name TEXT NOT NULL UNIQUE,
+          price REAL NOT NULL DEFAULT 0,
+          cost REAL DEFAULT 0,
+          inventory INTEGER DEFAULT 0,
+          reorderLevel INTEGER DEFAULT 0,
+          active INTEGER DEFAULT 1
+        );
 
-      // Create new table with correct schema
-      await db.exec(`
-        CREATE TABLE IF NOT EXISTS item_components_new (
+        -- Item components: items can contain other items (recursive/hierarchical)
+        -- Example: "Gift Basket" contains "Mirror" + "Candle x2" + "Basket"
+        -- And "Mirror" itself contains "Glass" + "Frame" + "Lights" etc.
+        CREATE TABLE IF NOT EXISTS item_components (
           id INTEGER PRIMARY KEY AUTOINCREMENT,
           parentItemId INTEGER NOT NULL,
           componentItemId INTEGER NOT NULL,
@@ -134,44 +63,205 @@ async function initDb() {
           includeInCost INTEGER DEFAULT 1,
           FOREIGN KEY (parentItemId) REFERENCES items(id) ON DELETE CASCADE,
           FOREIGN KEY (componentItemId) REFERENCES items(id) ON DELETE RESTRICT
-        )
+        );
+
+        CREATE TABLE IF NOT EXISTS invoices (
+          id INTEGER PRIMARY KEY AUTOINCREMENT,
+          clientId INTEGER,
+          invoiceNumber TEXT,
+          invoiceDate TEXT DEFAULT CURRENT_TIMESTAMP,
+          dueDate TEXT,
+          paymentStatus TEXT DEFAULT 'unpaid',
+          amountPaid REAL DEFAULT 0,
+          paymentDate TEXT,
+          notes TEXT,
+          createdAt TEXT DEFAULT CURRENT_TIMESTAMP,
+          total REAL,
+          FOREIGN KEY (clientId) REFERENCES clients(id)
+        );
+
+        CREATE TABLE IF NOT EXISTS invoice_items (
+          id INTEGER PRIMARY KEY AUTOINCREMENT,
+          invoiceId INTEGER,
+          itemId INTEGER,
+          quantity INTEGER NOT NULL,
+          price REAL NOT NULL,
+          taxExempt INTEGER DEFAULT 0,
+          FOREIGN KEY (invoiceId) REFERENCES invoices(id),
+          FOREIGN KEY (itemId) REFERENCES items(id)
+        );
+
+        CREATE TABLE IF NOT EXISTS settings (
+          id INTEGER PRIMARY KEY CHECK (id = 1),
+          businessName TEXT DEFAULT 'Your Business Name',
+          businessStreet TEXT DEFAULT '',
+          businessStreet2 TEXT DEFAULT '',
+          businessCity TEXT DEFAULT '',
+          businessState TEXT DEFAULT '',
+          businessZip TEXT DEFAULT '',
+          businessPhone TEXT DEFAULT '',
+          businessEmail TEXT DEFAULT '',
+          taxRate REAL DEFAULT 0.08,
+          bannerImage TEXT DEFAULT '',
+          invoiceNumberPrefix TEXT DEFAULT 'INV',
+          invoiceNumberNextSequence INTEGER DEFAULT 1,
+          defaultPaymentTerms INTEGER DEFAULT 30,
+          sellingFeePercent REAL DEFAULT 0,
+          sellingFeeFixed REAL DEFAULT 0
+        );
+
+        INSERT OR IGNORE INTO settings (id) VALUES (1);
       `);
 
-      // Copy data from old table (mapping old column names to new)
+      // Columns added over time to pre-versioning databases
+      await addColumnIfMissing(db, 'items', 'active', 'INTEGER DEFAULT 1');
+      await addColumnIfMissing(db, 'items', 'cost', 'REAL DEFAULT 0');
+      await addColumnIfMissing(db, 'items', 'inventory', 'INTEGER DEFAULT 0');
+      await addColumnIfMissing(db, 'items', 'reorderLevel', 'INTEGER DEFAULT 0');
+      await addColumnIfMissing(db, 'item_components', 'includeInCost', 'INTEGER DEFAULT 1');
+      await addColumnIfMissing(db, 'invoices', 'shipping', 'REAL DEFAULT 0');
+
+      // Rename old item_components columns if they exist
+      // Old schema had: itemId, inventoryProductId
+      // New schema has: parentItemId, componentItemId
+      const tableInfo = await db.all('PRAGMA table_info(item_components)');
+      const hasOldColumns = tableInfo.some(col => col.name === 'itemId' || col.name === 'inventoryProductId');
+
+      if (hasOldColumns) {
+        console.log('Migrating item_components table to new schema...');
+
+        await db.exec(`
+          CREATE TABLE item_components_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            parentItemId INTEGER NOT NULL,
+            componentItemId INTEGER NOT NULL,
+            quantityNeeded INTEGER NOT NULL DEFAULT 1,
+            includeInCost INTEGER DEFAULT 1,
+            FOREIGN KEY (parentItemId) REFERENCES items(id) ON DELETE CASCADE,
+            FOREIGN KEY (componentItemId) REFERENCES items(id) ON DELETE RESTRICT
+          );
+
+          INSERT INTO item_components_new (id, parentItemId, componentItemId, quantityNeeded, includeInCost)
+          SELECT id, itemId, inventoryProductId, quantityNeeded, 1 FROM item_components;
+
+          DROP TABLE item_components;
+          ALTER TABLE item_components_new RENAME TO item_components;
+        `);
+      }
+    }
+  },
+  {
+    version: 2,
+    description: 'Performance indexes',
+    async up(db) {
+      // Older builds could issue the same number twice (sequence reset in Settings).
+      // Renumbering sent invoices isn't safe, so leave those databases without the
+      // unique index rather than failing the whole migration.
+      const duplicates = await db.all(`
+        SELECT invoiceNumber FROM invoices
+        WHERE invoiceNumber IS NOT NULL
+        GROUP BY invoiceNumber HAVING COUNT(*) > 1
+      `);
+      if (duplicates.length > 0) {
+        console.warn(
+          `Skipping unique invoice number index: ${duplicates.length} invoice number(s) are used more than once ` +
+          `(${duplicates.slice(0, 5).map(d => d.invoiceNumber).join(', ')}${duplicates.length > 5 ? ', ...' : ''}).`
+        );
+      } else {
+        await db.exec('CREATE UNIQUE INDEX IF NOT EXISTS idx_invoices_invoiceNumber ON invoices(invoiceNumber)');
+      }
+
       await db.exec(`
-        INSERT INTO item_components_new (id, parentItemId, componentItemId, quantityNeeded, includeInCost)
-        SELECT id, itemId, inventoryProductId, quantityNeeded, 1 FROM item_components
+        CREATE INDEX IF NOT EXISTS idx_invoices_clientId ON invoices(clientId);
+        CREATE INDEX IF NOT EXISTS idx_invoices_paymentStatus ON invoices(paymentStatus);
+        CREATE INDEX IF NOT EXISTS idx_invoices_invoiceDate ON invoices(invoiceDate);
+        CREATE INDEX IF NOT EXISTS idx_invoice_items_invoiceId ON invoice_items(invoiceId);
+        CREATE INDEX IF NOT EXISTS idx_invoice_items_itemId ON invoice_items(itemId);
+        CREATE INDEX IF NOT EXISTS idx_item_components_parentItemId ON item_components(parentItemId);
+        CREATE INDEX IF NOT EXISTS idx_item_components_componentItemId ON item_components(componentItemId);
       `);
+    }
+  },
+  {
+    version: 3,
+    description: 'Invoice archive age setting',
+    async up(db) {
+      await addColumnIfMissing(db, 'settings', 'archiveAfterDays', 'INTEGER DEFAULT 365');
+    }
+  },
+  {
+    version: 4,
+    description: 'Stored invoice totals and line cost snapshots',
+    async up(db) {
+      await addColumnIfMissing(db, 'invoices', 'subtotal', 'REAL');
+      await addColumnIfMissing(db, 'invoices', 'taxableSubtotal', 'REAL');
+      await addColumnIfMissing(db, 'invoices', 'tax', 'REAL');
+      await addColumnIfMissing(db, 'invoices', 'cogs', 'REAL');
+      await addColumnIfMissing(db, 'invoices', 'sellingFees', 'REAL');
+      await addColumnIfMissing(db, 'invoice_items', 'unitCost', 'REAL');
 
-      // Drop old table and rename new one
-      await db.exec(`DROP TABLE item_components`);
-      await db.exec(`ALTER TABLE item_components_new RENAME TO item_components`);
+      // Covering index for /reports/summary: date-range totals never touch the table rows
+      await db.exec(`
+        CREATE INDEX IF NOT EXISTS idx_invoices_report ON invoices(
+          invoiceDate, paymentStatus, total, subtotal, taxableSubtotal, tax, cogs, sellingFees, shipping
+        );
+      `);
 
-      console.log('Migration complete: item_components table updated.');
+      await backfillInvoiceTotals(db);
     }
-  } catch (e) {
-    console.error('Migration check/run error:', e.message);
+  },
+];
+
+const LATEST_VERSION = migrations[migrations.length - 1].version;
+
+// Apply all pending migrations in a single transaction.
+// On an up-to-date database this is a single PRAGMA read.
+async function runMigrations(db) {
+  const { user_version: currentVersion } = await db.get('PRAGMA user_version');
+  if (currentVersion >= LATEST_VERSION) {
+    return { from: currentVersion, to: currentVersion, applied: [] };
   }
 
-  // Performance indexes
-  const indexesToCreate = [
-    'CREATE UNIQUE INDEX IF NOT EXISTS idx_invoices_invoiceNumber ON invoices(invoiceNumber)',
-    'CREATE INDEX IF NOT EXISTS idx_invoices_clientId ON invoices(clientId)',
-    'CREATE INDEX IF NOT EXISTS idx_invoices_paymentStatus ON invoices(paymentStatus)',
-    'CREATE INDEX IF NOT EXISTS idx_invoices_invoiceDate ON invoices(invoiceDate)',
-    'CREATE INDEX IF NOT EXISTS idx_invoice_items_invoiceId ON invoice_items(invoiceId)',
-    'CREATE INDEX IF NOT EXISTS idx_invoice_items_itemId ON invoice_items(itemId)',
-    'CREATE INDEX IF NOT EXISTS idx_item_components_parentItemId ON item_components(parentItemId)',
-    'CREATE INDEX IF NOT EXISTS idx_item_components_componentItemId ON item_components(componentItemId)',
-  ];
-
-  for (const sql of indexesToCreate) {
-    try {
-      await db.exec(sql);
-    } catch (e) { /* index already exists */ }
+  await db.run('BEGIN IMMEDIATE');
+  let pending;
+  try {
+    // Re-read under the write lock in case another process migrated first
+    const { user_version: lockedVersion } = await db.get('PRAGMA user_version');
+    pending = migrations.filter(m => m.version > lockedVersion);
+    for (const migration of pending) {
+      await migration.up(db);
+    }
+    // PRAGMA values can't be bound as parameters; version is a trusted integer
+    await db.exec(`PRAGMA user_version = ${LATEST_VERSION}`);
+    await db.run('COMMIT');
+  } catch (error) {
+    await db.run('ROLLBACK');
+    throw error;
   }
 
+  return { from: currentVersion, to: LATEST_VERSION, applied: pending.map(m => m.version) };
+}
+
+async function initDb() {
+  const db = await openDb();
+  const { from, to, applied } = await runMigrations(db);
+  if (applied.length > 0) {
+    console.log(`Database migrated from version ${from} to ${to}.`);
+  }
+  // Attach and sync an existing archive now, while no request can hold a transaction
+  if (await attachArchiveIfExists(db)) {
+    console.log('Invoice archive attached.');
+  }
   console.log('Database initialized.');
+  return db;
+}
+
+// Allow running directly: npm run init-db
+if (require.main === module) {
+  initDb().catch(error => {
+    console.error('Database initialization failed:', error);
+    process.exit(1);
+  });
 }
 
-initDb();
+module.exports = { initDb, runMigrations, migrations, LATEST_VERSION };
@@ -0,0 +1,129 @@
+/**
+ * Invoice Creator - Invoice Totals
+ * Copyright (c) 2025 Blue Line Scannables
+ * All Rights Reserved - Proprietary Software
+ *
+ * Subtotal, tax, COGS and selling fees are stored on each invoice when it is
+ * written, and each line keeps the unit cost at the time of sale. Reports read
+ * these columns instead of re-joining items.cost, which may have changed since.
+ */
+
+// Helper to round money (same rounding as the invoice form)
+function roundMoney(value) {
+  return Math.round((value + Number.EPSILON) * 100) / 100;
+}
+
+// Helper: Calculate item cost from components (recursive)
+// Only includes components where includeInCost = 1 (or NULL for backwards compatibility)
+async function calculateItemCost(db, itemId, visited = new Set()) {
+  // Prevent infinite loops from circular references
+  if (visited.has(itemId)) return 0;
+  visited.add(itemId);
+
+  const components = await db.all(
+    'SELECT componentItemId, quantityNeeded, includeInCost FROM item_components WHERE parentItemId = ?',
+    [itemId]
+  );
+
+  if (components.length === 0) {
+    // No components - use item's own cost
+    const item = await db.get('SELECT cost FROM items WHERE id = ?', [itemId]);
+    return item ? parseFloat(item.cost) || 0 : 0;
+  }
+
+  // Sum up component costs (only those marked as includeInCost)
+  let totalCost = 0;
+  for (const comp of components) {
+    // Include if includeInCost is 1 or NULL (backwards compatibility)
+    if (comp.includeInCost === 0) continue;
+    const componentCost = await calculateItemCost(db, comp.componentItemId, new Set(visited));
+    totalCost += componentCost * comp.quantityNeeded;
+  }
+  return totalCost;
+}
+
+// Compute stored invoice totals from its lines ({ quantity, price, taxExempt, unitCost })
+// Stored tax is always the tax actually charged: total - subtotal - shipping.
+// Only when no total is known is it estimated from the tax rate, rounded per
+// line with the same default rate as the invoice form.
+function computeInvoiceTotals(lines, settings, { total, shipping } = {}) {
+  const taxRate = settings.taxRate || 0.08;
+  const feePercent = settings.sellingFeePercent || 0;
+  const feeFixed = settings.sellingFeeFixed || 0;
+
+  let subtotal = 0;
+  let taxableSubtotal = 0;
+  let tax = 0;
+  let cogs = 0;
+
+  for (const line of lines) {
+    const quantity = parseInt(line.quantity) || 0;
+    const lineTotal = quantity * (parseFloat(line.price) || 0);
+    subtotal += lineTotal;
+    cogs += quantity * (parseFloat(line.unitCost) || 0);
+    if (!line.taxExempt) {
+      taxableSubtotal += lineTotal;
+      tax += roundMoney(lineTotal * taxRate);
+    }
+  }
+
+  subtotal = roundMoney(subtotal);
+  if (total != null) {
+    tax = Math.max(roundMoney(parseFloat(total) - subtotal - (parseFloat(shipping) || 0)), 0);
+  }
+  return {
+    subtotal,
+    taxableSubtotal: roundMoney(taxableSubtotal),
+    tax: roundMoney(tax),
+    cogs: roundMoney(cogs),
+    sellingFees: roundMoney((subtotal * feePercent / 100) + (subtotal > 0 ? feeFixed : 0))
+  };
+}
+
+// One-time fill of totals and line cost snapshots for rows written before they existed.
+// Only touches rows where they are still NULL, so re-running is cheap.
+// Historical line costs use the item's current cost - the best figure available.
+async function backfillInvoiceTotals(db, schema = 'main') {
+  const missingCosts = await db.all(
+    `SELECT DISTINCT itemId FROM ${schema}.invoice_items WHERE unitCost IS NULL`
+  );
+  for (const { itemId } of missingCosts) {
+    const unitCost = itemId == null ? 0 : await calculateItemCost(db, itemId);
+    await db.run(
+      `UPDATE ${schema}.invoice_items SET unitCost = ? WHERE itemId IS ? AND unitCost IS NULL`,
+      [unitCost, itemId]
+    );
+  }
+
+  const invoices = await db.all(
+    `SELECT id, total, shipping FROM ${schema}.invoices WHERE subtotal IS NULL`
+  );
+  if (invoices.length === 0) return 0;
+
+  const settings = await db.get('SELECT taxRate, sellingFeePercent, sellingFeeFixed FROM main.settings WHERE id = 1');
+
+  for (const invoice of invoices) {
+    const lines = await db.all(
+      `SELECT quantity, price, taxExempt, unitCost FROM ${schema}.invoice_items WHERE invoiceId = ?`,
+      [invoice.id]
+    );
+    // The stored total is what was actually charged; the tax rate may have changed since
+    const totals = computeInvoiceTotals(lines, settings, invoice);
+
+    await db.run(
+      `UPDATE ${schema}.invoices
+       SET subtotal = ?, taxableSubtotal = ?, tax = ?, cogs = ?, sellingFees = ?
+       WHERE id = ?`,
+      [totals.subtotal, totals.taxableSubtotal, totals.tax, totals.cogs, totals.sellingFees, invoice.id]
+    );
+  }
+
+  return invoices.length;
+}
+
+module.exports = {
+  roundMoney,
+  calculateItemCost,
+  computeInvoiceTotals,
+  backfillInvoiceTotals
+};
@@ -5,7 +5,9 @@ module.exports = {
   collectCoverageFrom: [
     'index.js',
     'database.js',
-    'init-db.js'
+    'init-db.js',
+    'archive.js',
+    'invoice-totals.js'
   ],
   testMatch: [
     '**/__tests__/**/*.test.js'
@@ -42,16 +42,10 @@ function App() {
 
   const loadNavStats = async () => {
     try {
-      const invoices = await api.getInvoices();
-      let totalBilled = 0;
-      let count = 0;
-      invoices.forEach(inv => {
-        if (inv.paymentStatus !== 'voided') {
-          count++;
-          totalBilled += parseFloat(inv.total) || 0;
-        }
-      });
-      setNavStats({ invoiceCount: count, totalBilled: Math.round(totalBilled * 100) / 100 });
+      // Non-voided totals across active and archived invoices, summed by the backend
+      const [summary] = await api.getReportSummary({ includeArchived: true });
+      const totalBilled = summary ? summary.revenue : 0;
+      setNavStats({ invoiceCount: summary ? summary.invoiceCount : 0, totalBilled: Math.round(totalBilled * 100) / 100 });
     } catch (err) {
       console.error('Failed to load nav stats', err);
     }
@@ -173,8 +173,10 @@ export const api = {
   },
 
   // Invoices
-  async getInvoices() {
-    const res = await fetch(`${API_BASE}/invoices`);
+  // includeArchived: also return invoices moved to the archive database (reports, backup)
+  async getInvoices({ includeArchived = false } = {}) {
+    const query = includeArchived ? '?includeArchived=true' : '';
+    const res = await fetch(`${API_BASE}/invoices${query}`);
     return res.json();
   },
 
@@ -244,6 +246,42 @@ export const api = {
     return res.json();
   },
 
+  // Reports
+  async getItemSales({ from, to, includeArchived = false } = {}) {
+    const params = new URLSearchParams();
+    if (from) params.set('from', from);
+    if (to) params.set('to', to);
+    if (includeArchived) params.set('includeArchived', 'true');
+    const res = await fetch(`${API_BASE}/reports/item-sales?${params}`);
+    if (!res.ok) throw new Error('Failed to load item sales');
+    return res.json();
+  },
+
+  // Stored invoice totals grouped by period ('all', 'month', 'quarter' or 'year'), voided excluded
+  async getReportSummary({ period = 'all', from, to, includeArchived = false } = {}) {
+    const params = new URLSearchParams({ period });
+    if (from) params.set('from', from);
+    if (to) params.set('to', to);
+    if (includeArchived) params.set('includeArchived', 'true');
+    const res = await fetch(`${API_BASE}/reports/summary?${params}`);
+    if (!res.ok) throw new Error('Failed to load report summary');
+    return res.json();
+  },
+
+  // Move old paid/voided invoices to the archive database
+  async archiveInvoices(olderThanDays) {
+    const res = await fetch(`${API_BASE}/invoices/archive`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ olderThanDays }),
+    });
+    if (!res.ok) {
+      const error = await res.json();
+      throw new Error(error.message || 'Failed to archive invoices');
+    }
+    return res.json();
+  },
+
   // Full data restore
   async restoreData(backup) {
     const res = await fetch(`${API_BASE}/restore`, {
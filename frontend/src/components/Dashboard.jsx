@@ -25,7 +25,8 @@ export default function Dashboard() {
   const loadMetrics = async () => {
     try {
       const [invoices, items] = await Promise.all([
-        api.getInvoices(),
+        // Archived invoices are settled, but still count toward billed/collected
+        api.getInvoices({ includeArchived: true }),
         api.getItems(),
       ]);
 
@@ -79,7 +79,7 @@ export default function ExportData() {
     setExporting(true);
     setMessage(null);
     try {
-      const invoices = await api.getInvoices();
+      const invoices = await api.getInvoices({ includeArchived: true });
       const headers = ['Invoice #', 'Date', 'Due Date', 'Client', 'Total', 'Status', 'Amount Paid'];
       const rows = invoices.map(i => [
         i.invoiceNumber || i.id,
@@ -102,7 +102,7 @@ export default function ExportData() {
     setExporting(true);
     setMessage(null);
     try {
-      const invoices = await api.getInvoices();
+      const invoices = await api.getInvoices({ includeArchived: true });
       const settings = await api.getSettings();
 
       // Group by month
@@ -172,50 +172,52 @@ export default function ExportData() {
     return 'All Time';
   };
 
+  // Per-item quantity, revenue and cost for the selected date range (aggregated by the backend)
+  const getItemSalesForRange = () => {
+    return api.getItemSales({
+      from: allTime ? undefined : dateFrom,
+      to: allTime ? undefined : dateTo,
+      includeArchived: true,
+    });
+  };
+
+  // Stored invoice totals per period for the selected date range (aggregated by the backend)
+  const getSummaryForRange = (period) => {
+    return api.getReportSummary({
+      period,
+      from: allTime ? undefined : dateFrom,
+      to: allTime ? undefined : dateTo,
+      includeArchived: true,
+    });
+  };
+
   // Report: Profit Analysis
   const generateProfitAnalysis = async () => {
     setExporting(true);
     setMessage(null);
     try {
-      const [invoices, settings] = await Promise.all([
-        api.getInvoices(),
-        api.getSettings(),
+      const [summary, itemSales] = await Promise.all([
+        getSummaryForRange('all'),
+        getItemSalesForRange(),
       ]);
 
-      const filtered = filterByDateRange(invoices, dateFrom, dateTo);
-      const feePercent = settings.sellingFeePercent || 0;
-      const feeFixed = settings.sellingFeeFixed || 0;
+      // Stored invoice totals (cost is the snapshot taken at time of sale)
+      const overall = summary[0] || { invoiceCount: 0, revenue: 0, cogs: 0, sellingFees: 0, tax: 0 };
+      const totalRevenue = overall.revenue;
+      const totalCosts = overall.cogs;
+      const totalFees = overall.sellingFees;
+      const totalTax = overall.tax;
 
-      // Aggregate data
-      let totalRevenue = 0;
-      let totalCosts = 0;
-      let totalFees = 0;
-      let totalTax = 0;
       const itemStats = {};
-
-      for (const inv of filtered) {
-        const invoiceData = await api.getInvoice(inv.id);
-        const subtotal = (invoiceData.items || []).reduce((sum, item) => {
-          const itemTotal = (parseFloat(item.price) || 0) * (item.quantity || 0);
-          const itemCost = (parseFloat(item.itemCost) || 0) * (item.quantity || 0);
-
-          // Track per-item stats
-          const itemName = item.itemName || 'Unknown';
-          if (!itemStats[itemName]) {
-            itemStats[itemName] = { revenue: 0, cost: 0, qty: 0 };
-          }
-          itemStats[itemName].revenue += itemTotal;
-          itemStats[itemName].cost += itemCost;
-          itemStats[itemName].qty += item.quantity || 0;
-
-          totalCosts += itemCost;
-          return sum + itemTotal;
-        }, 0);
-
-        totalRevenue += parseFloat(inv.total) || 0;
-        totalTax += (parseFloat(inv.total) || 0) - subtotal;
-        totalFees += roundMoney((subtotal * feePercent / 100) + (subtotal > 0 ? feeFixed : 0));
-      }
+      itemSales.forEach(row => {
+        const itemName = row.itemName || 'Unknown';
+        if (!itemStats[itemName]) {
+          itemStats[itemName] = { revenue: 0, cost: 0, qty: 0 };
+        }
+        itemStats[itemName].revenue += row.revenue || 0;
+        itemStats[itemName].cost += row.cost || 0;
+        itemStats[itemName].qty += row.qty || 0;
+      });
 
       const totalProfit = roundMoney(totalRevenue - totalCosts - totalFees);
 
@@ -253,7 +255,7 @@ export default function ExportData() {
         });
 
       downloadCSV(rows.map(r => r.join(',')).join('\n'), `profit-analysis-${new Date().toISOString().split('T')[0]}.csv`);
-      setMessage({ type: 'success', text: `Generated Profit Analysis for ${filtered.length} invoices` });
+      setMessage({ type: 'success', text: `Generated Profit Analysis for ${overall.invoiceCount} invoices` });
     } catch (err) {
       console.error(err);
       setMessage({ type: 'error', text: 'Failed to generate Profit Analysis' });
@@ -324,7 +326,7 @@ export default function ExportData() {
     setExporting(true);
     setMessage(null);
     try {
-      const invoices = await api.getInvoices();
+      const invoices = await api.getInvoices({ includeArchived: true });
       const filtered = filterByDateRange(invoices, dateFrom, dateTo);
 
       const clientStats = {};
@@ -383,47 +385,26 @@ export default function ExportData() {
     setExporting(true);
     setMessage(null);
     try {
-      const [invoices, settings] = await Promise.all([
-        api.getInvoices(),
+      const [monthly, settings] = await Promise.all([
+        getSummaryForRange('month'),
         api.getSettings(),
       ]);
 
-      const filtered = filterByDateRange(invoices, dateFrom, dateTo);
       const taxRate = settings.taxRate || 0.08;
 
       let totalTaxable = 0;
       let totalNonTaxable = 0;
       let totalTaxCollected = 0;
+      let invoiceCount = 0;
       const monthlyTax = {};
 
-      for (const inv of filtered) {
-        const invoiceData = await api.getInvoice(inv.id);
-        let taxable = 0;
-        let nonTaxable = 0;
-
-        (invoiceData.items || []).forEach(item => {
-          const lineTotal = (parseFloat(item.price) || 0) * (item.quantity || 0);
-          if (item.taxExempt) {
-            nonTaxable += lineTotal;
-          } else {
-            taxable += lineTotal;
-          }
-        });
-
-        const taxAmount = roundMoney(taxable * taxRate);
-        totalTaxable += taxable;
+      for (const row of monthly) {
+        const nonTaxable = row.subtotal - row.taxableSubtotal;
+        totalTaxable += row.taxableSubtotal;
         totalNonTaxable += nonTaxable;
-        totalTaxCollected += taxAmount;
-
-        // Group by month
-        const date = new Date(inv.invoiceDate || inv.createdAt);
-        const monthKey = `${date.getFullYear()}-${String(date.getMonth() + 1).padStart(2, '0')}`;
-        if (!monthlyTax[monthKey]) {
-          monthlyTax[monthKey] = { taxable: 0, nonTaxable: 0, tax: 0 };
-        }
-        monthlyTax[monthKey].taxable += taxable;
-        monthlyTax[monthKey].nonTaxable += nonTaxable;
-        monthlyTax[monthKey].tax += taxAmount;
+        totalTaxCollected += row.tax;
+        invoiceCount += row.invoiceCount;
+        monthlyTax[row.period] = { taxable: row.taxableSubtotal, nonTaxable, tax: row.tax };
       }
 
       const rows = [
@@ -453,7 +434,7 @@ export default function ExportData() {
         });
 
       downloadCSV(rows.map(r => r.join(',')).join('\n'), `tax-report-${new Date().toISOString().split('T')[0]}.csv`);
-      setMessage({ type: 'success', text: `Generated Tax Report for ${filtered.length} invoices` });
+      setMessage({ type: 'success', text: `Generated Tax Report for ${invoiceCount} invoices` });
     } catch (err) {
       console.error(err);
       setMessage({ type: 'error', text: 'Failed to generate Tax Report' });
@@ -466,23 +447,19 @@ export default function ExportData() {
     setExporting(true);
     setMessage(null);
     try {
-      const invoices = await api.getInvoices();
-      const filtered = filterByDateRange(invoices, dateFrom, dateTo);
+      const itemSales = await getItemSalesForRange();
 
       const itemStats = {};
 
-      for (const inv of filtered) {
-        const invoiceData = await api.getInvoice(inv.id);
-        (invoiceData.items || []).forEach(item => {
-          const itemName = item.itemName || 'Unknown';
-          if (!itemStats[itemName]) {
-            itemStats[itemName] = { qty: 0, revenue: 0, invoices: new Set() };
-          }
-          itemStats[itemName].qty += item.quantity || 0;
-          itemStats[itemName].revenue += (parseFloat(item.price) || 0) * (item.quantity || 0);
-          itemStats[itemName].invoices.add(inv.id);
-        });
-      }
+      itemSales.forEach(row => {
+        const itemName = row.itemName || 'Unknown';
+        if (!itemStats[itemName]) {
+          itemStats[itemName] = { qty: 0, revenue: 0, invoiceCount: 0 };
+        }
+        itemStats[itemName].qty += row.qty || 0;
+        itemStats[itemName].revenue += row.revenue || 0;
+        itemStats[itemName].invoiceCount += row.invoiceCount || 0;
+      });
 
       const rows = [
         ['SALES BY ITEM REPORT'],
@@ -502,7 +479,7 @@ export default function ExportData() {
             escapeCSV(name),
             stats.qty,
             `$${stats.revenue.toFixed(2)}`,
-            stats.invoices.size,
+            stats.invoiceCount,
             `$${avgPrice.toFixed(2)}`
           ]);
           totalQty += stats.qty;
@@ -526,55 +503,24 @@ export default function ExportData() {
     setExporting(true);
     setMessage(null);
     try {
-      const [invoices, settings] = await Promise.all([
-        api.getInvoices(),
+      const [quarterly, settings] = await Promise.all([
+        getSummaryForRange('quarter'),
         api.getSettings(),
       ]);
 
-      const filtered = filterByDateRange(invoices, dateFrom, dateTo);
       const taxRate = settings.taxRate || 0.08;
 
-      // Group by quarter
+      // Grouped by quarter on the backend
       const quarterlyData = {};
 
-      for (const inv of filtered) {
-        const invoiceData = await api.getInvoice(inv.id);
-        const date = new Date(inv.invoiceDate || inv.createdAt);
-        const quarter = Math.floor(date.getMonth() / 3) + 1;
-        const quarterKey = `${date.getFullYear()}-Q${quarter}`;
-
-        if (!quarterlyData[quarterKey]) {
-          quarterlyData[quarterKey] = {
-            taxableSales: 0,
-            exemptSales: 0,
-            taxCollected: 0,
-            invoiceCount: 0,
-            paidTax: 0
-          };
-        }
-
-        let taxable = 0;
-        let exempt = 0;
-
-        (invoiceData.items || []).forEach(item => {
-          const lineTotal = (parseFloat(item.price) || 0) * (item.quantity || 0);
-          if (item.taxExempt) {
-            exempt += lineTotal;
-          } else {
-            taxable += lineTotal;
-          }
-        });
-
-        const taxAmount = roundMoney(taxable * taxRate);
-        quarterlyData[quarterKey].taxableSales += taxable;
-        quarterlyData[quarterKey].exemptSales += exempt;
-        quarterlyData[quarterKey].taxCollected += taxAmount;
-        quarterlyData[quarterKey].invoiceCount += 1;
-
-        // Track tax on paid invoices
-        if (inv.paymentStatus === 'paid') {
-          quarterlyData[quarterKey].paidTax += taxAmount;
-        }
+      for (const row of quarterly) {
+        quarterlyData[row.period] = {
+          taxableSales: row.taxableSubtotal,
+          exemptSales: row.subtotal - row.taxableSubtotal,
+          taxCollected: row.tax,
+          invoiceCount: row.invoiceCount,
+          paidTax: row.paidTax
+        };
       }
 
       const rows = [
@@ -612,7 +558,7 @@ export default function ExportData() {
         `$${(totals.taxable + totals.exempt).toFixed(2)}`, `$${totals.tax.toFixed(2)}`, `$${totals.paidTax.toFixed(2)}`]);
 
       downloadCSV(rows.map(r => r.join(',')).join('\n'), `quarterly-tax-${new Date().toISOString().split('T')[0]}.csv`);
-      setMessage({ type: 'success', text: `Generated Quarterly Tax Summary for ${filtered.length} invoices` });
+      setMessage({ type: 'success', text: `Generated Quarterly Tax Summary for ${totals.invoices} invoices` });
     } catch (err) {
       console.error(err);
       setMessage({ type: 'error', text: 'Failed to generate Quarterly Tax Summary' });
@@ -625,60 +571,23 @@ export default function ExportData() {
     setExporting(true);
     setMessage(null);
     try {
-      const [invoices, settings] = await Promise.all([
-        api.getInvoices(),
-        api.getSettings(),
-      ]);
-
-      const filtered = filterByDateRange(invoices, dateFrom, dateTo);
-      const taxRate = settings.taxRate || 0.08;
-      const feePercent = settings.sellingFeePercent || 0;
-      const feeFixed = settings.sellingFeeFixed || 0;
+      const yearly = await getSummaryForRange('year');
 
-      // Group by year
+      // Grouped by year on the backend
       const yearlyData = {};
-
-      for (const inv of filtered) {
-        const invoiceData = await api.getInvoice(inv.id);
-        const date = new Date(inv.invoiceDate || inv.createdAt);
-        const year = date.getFullYear().toString();
-
-        if (!yearlyData[year]) {
-          yearlyData[year] = {
-            revenue: 0,
-            costs: 0,
-            taxCollected: 0,
-            fees: 0,
-            invoiceCount: 0,
-            paidCount: 0,
-            collected: 0
-          };
-        }
-
-        let subtotal = 0;
-        let itemCosts = 0;
-
-        (invoiceData.items || []).forEach(item => {
-          const lineTotal = (parseFloat(item.price) || 0) * (item.quantity || 0);
-          const lineCost = (parseFloat(item.itemCost) || 0) * (item.quantity || 0);
-          subtotal += lineTotal;
-          itemCosts += lineCost;
-        });
-
-        const total = parseFloat(inv.total) || 0;
-        const taxAmount = total - subtotal;
-        const fees = roundMoney((subtotal * feePercent / 100) + (subtotal > 0 ? feeFixed : 0));
-
-        yearlyData[year].revenue += total;
-        yearlyData[year].costs += itemCosts;
-        yearlyData[year].taxCollected += taxAmount;
-        yearlyData[year].fees += fees;
-        yearlyData[year].invoiceCount += 1;
-
-        if (inv.paymentStatus === 'paid') {
-          yearlyData[year].paidCount += 1;
-          yearlyData[year].collected += total;
-        }
+      let invoiceCount = 0;
+
+      for (const row of yearly) {
+        yearlyData[row.period] = {
+          revenue: row.revenue,
+          costs: row.cogs,
+          taxCollected: row.tax,
+          fees: row.sellingFees,
+          invoiceCount: row.invoiceCount,
+          paidCount: row.paidCount,
+          collected: row.collected
+        };
+        invoiceCount += row.invoiceCount;
       }
 
       const rows = [
@@ -707,7 +616,7 @@ export default function ExportData() {
         });
 
       downloadCSV(rows.map(r => r.join(',')).join('\n'), `annual-summary-${new Date().toISOString().split('T')[0]}.csv`);
-      setMessage({ type: 'success', text: `Generated Annual Summary for ${filtered.length} invoices` });
+      setMessage({ type: 'success', text: `Generated Annual Summary for ${invoiceCount} invoices` });
     } catch (err) {
       console.error(err);
       setMessage({ type: 'error', text: 'Failed to generate Annual Summary' });
@@ -11,6 +11,8 @@ export default function InvoiceList({ onEdit, onView, onDuplicate, refreshKey })
   const [statusFilter, setStatusFilter] = useState('all');
   const [dateFrom, setDateFrom] = useState('');
   const [dateTo, setDateTo] = useState('');
+  // Archived invoices live in a separate database and are only loaded on request
+  const [includeArchived, setIncludeArchived] = useState(false);
 
   // Pagination state
   const [currentPage, setCurrentPage] = useState(1);
@@ -22,11 +24,11 @@ export default function InvoiceList({ onEdit, onView, onDuplicate, refreshKey })
 
   useEffect(() => {
     loadInvoices();
-  }, [refreshKey]);
+  }, [refreshKey, includeArchived]);
 
   const loadInvoices = async () => {
     try {
-      const data = await api.getInvoices();
+      const data = await api.getInvoices({ includeArchived });
       setInvoices(data);
     } catch (err) {
       setMessage({ type: 'error', text: 'Failed to load invoices' });
@@ -122,6 +124,10 @@ export default function InvoiceList({ onEdit, onView, onDuplicate, refreshKey })
   };
 
   const getStatusBadge = (invoice) => {
+    if (invoice.archived) {
+      const label = invoice.paymentStatus === 'voided' ? 'Voided' : 'Paid';
+      return <span className="status-badge status-archived">Archived · {label}</span>;
+    }
     if (invoice.paymentStatus === 'voided') {
       return <span className="status-badge status-voided">Voided</span>;
     }
@@ -274,6 +280,16 @@ export default function InvoiceList({ onEdit, onView, onDuplicate, refreshKey })
               onChange={(e) => handleFilterChange(setDateTo)(e.target.value)}
             />
           </div>
+          <div style={{ display: 'flex', alignItems: 'flex-end' }}>
+            <label style={{ fontSize: '0.85rem', display: 'flex', alignItems: 'center', gap: '0.35rem', marginBottom: '0.5rem' }}>
+              <input
+                type="checkbox"
+                checked={includeArchived}
+                onChange={(e) => { setIncludeArchived(e.target.checked); setCurrentPage(1); }}
+              />
+              Include archived
+            </label>
+          </div>
           {hasActiveFilters && (
             <div style={{ display: 'flex', alignItems: 'flex-end' }}>
               <button className="btn btn-sm btn-secondary" onClick={clearFilters}>
@@ -346,7 +362,7 @@ export default function InvoiceList({ onEdit, onView, onDuplicate, refreshKey })
                 >
                   View/Print
                 </button>
-                {invoice.paymentStatus !== 'voided' && (
+                {!invoice.archived && invoice.paymentStatus !== 'voided' && (
                   <button
                     className="btn btn-sm btn-secondary"
                     onClick={() => onEdit(invoice.id)}
@@ -364,14 +380,16 @@ export default function InvoiceList({ onEdit, onView, onDuplicate, refreshKey })
                     Duplicate
                   </button>
                 )}
-                <button
-                  className="btn btn-sm btn-danger"
-                  onClick={() => handleDelete(invoice.id)}
-                  style={{ marginRight: '0.5rem' }}
-                >
-                  Delete
-                </button>
-                {invoice.paymentStatus !== 'voided' && invoice.paymentStatus !== 'paid' && (
+                {!invoice.archived && (
+                  <button
+                    className="btn btn-sm btn-danger"
+                    onClick={() => handleDelete(invoice.id)}
+                    style={{ marginRight: '0.5rem' }}
+                  >
+                    Delete
+                  </button>
+                )}
+                {!invoice.archived && invoice.paymentStatus !== 'voided' && invoice.paymentStatus !== 'paid' && (
                   <button
                     className="btn btn-sm"
                     onClick={() => openPaymentModal(invoice)}
@@ -380,7 +398,7 @@ export default function InvoiceList({ onEdit, onView, onDuplicate, refreshKey })
                     Record Payment
                   </button>
                 )}
-                {invoice.paymentStatus !== 'voided' && (
+                {!invoice.archived && invoice.paymentStatus !== 'voided' && (
                   <button
                     className="btn btn-sm"
                     onClick={() => handleVoid(invoice.id)}
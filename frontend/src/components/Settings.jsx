@@ -31,6 +31,7 @@ export default function Settings() {
     defaultPaymentTerms: 30,
     sellingFeePercent: 0,
     sellingFeeFixed: 0,
+    archiveAfterDays: 365,
   });
   const [loading, setLoading] = useState(true);
   const [message, setMessage] = useState(null);
@@ -63,6 +64,7 @@ export default function Settings() {
         defaultPaymentTerms: data.defaultPaymentTerms ?? 30,
         sellingFeePercent: data.sellingFeePercent || 0,
         sellingFeeFixed: data.sellingFeeFixed || 0,
+        archiveAfterDays: data.archiveAfterDays ?? 365,
       });
     } catch (err) {
       setMessage({ type: 'error', text: 'Failed to load settings' });
@@ -93,6 +95,12 @@ export default function Settings() {
     }
   };
 
+  // Archive age from the form; 0 is valid (archive everything settled), only blank falls back
+  const getArchiveAfterDays = () => {
+    const days = parseInt(form.archiveAfterDays);
+    return Number.isNaN(days) ? 365 : days;
+  };
+
   const handleSubmit = async (e) => {
     e.preventDefault();
     try {
@@ -103,6 +111,7 @@ export default function Settings() {
         defaultPaymentTerms: parseInt(form.defaultPaymentTerms),
         sellingFeePercent: parseFloat(form.sellingFeePercent) || 0,
         sellingFeeFixed: parseFloat(form.sellingFeeFixed) || 0,
+        archiveAfterDays: getArchiveAfterDays(),
       });
       setMessage({ type: 'success', text: 'Settings saved successfully' });
     } catch (err) {
@@ -110,6 +119,19 @@ export default function Settings() {
     }
   };
 
+  const handleArchiveInvoices = async () => {
+    const days = getArchiveAfterDays();
+    if (!confirm(`Move paid and voided invoices older than ${days} days to the archive? They stay available in reports and backups but are no longer editable.`)) {
+      return;
+    }
+    try {
+      const result = await api.archiveInvoices(days);
+      setMessage({ type: 'success', text: result.message });
+    } catch (err) {
+      setMessage({ type: 'error', text: 'Failed to archive invoices: ' + err.message });
+    }
+  };
+
   const handleResetSequence = () => {
     if (confirm('Reset invoice number sequence to 1? This cannot be undone.')) {
       setForm({ ...form, invoiceNumberNextSequence: 1 });
@@ -121,7 +143,7 @@ export default function Settings() {
     const [clients, items, invoices, settings] = await Promise.all([
       api.getClients(),
       api.getItems(),
-      api.getInvoices(),
+      api.getInvoices({ includeArchived: true }),
       api.getSettings(),
     ]);
 
@@ -515,6 +537,28 @@ export default function Settings() {
           </div>
         </div>
 
+        <h3>Invoice Archive</h3>
+        <p style={{ color: '#666', marginBottom: '1rem' }}>
+          Move old paid and voided invoices to a separate archive file to keep the app fast.
+          Archived invoices still appear in reports, exports and backups.
+        </p>
+        <div className="form-row" style={{ alignItems: 'flex-end' }}>
+          <div className="form-group" style={{ maxWidth: '250px' }}>
+            <label>Archive invoices older than (days)</label>
+            <input
+              type="number"
+              min="0"
+              value={form.archiveAfterDays}
+              onChange={(e) => setForm({ ...form, archiveAfterDays: e.target.value })}
+            />
+          </div>
+          <div className="form-group">
+            <button type="button" className="btn btn-secondary" onClick={handleArchiveInvoices}>
+              Archive Now
+            </button>
+          </div>
+        </div>
+
         <div className="btn-group">
           <button type="submit" className="btn btn-primary">
             Save Settings
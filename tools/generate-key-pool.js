@@ -8,86 +8,237 @@
  * Usage:
  *   node tools/generate-key-pool.js --count 50
  *   node tools/generate-key-pool.js --count 100 --output keys.csv
+ *   node tools/generate-key-pool.js --bulk --count 100000 --output keys.csv
+ *   node tools/generate-key-pool.js --verify keys.csv
+ *
+ * Bulk mode signs keys on worker threads and streams them to the CSV file,
+ * so memory use doesn't grow with the output size.
  */
 
 const crypto = require('crypto');
 const fs = require('fs');
+const os = require('os');
 const path = require('path');
+const readline = require('readline');
+const { once } = require('events');
+const { Worker, isMainThread, parentPort, workerData } = require('worker_threads');
+const {
+  PRIVATE_KEY_PATH,
+  PUBLIC_KEY_PATH,
+  KEY_VERSION,
+  getKeyVersion,
+  buildLicenseKey,
+  verifyLicenseKey
+} = require('./license-generator');
 
-// Paths for keys
-const KEYS_DIR = path.join(__dirname, 'keys');
-const PRIVATE_KEY_PATH = path.join(KEYS_DIR, 'private.pem');
+// Keys signed per worker round-trip in bulk mode
+const BATCH_SIZE = 500;
 
-// Base32 alphabet (Crockford's variant)
-const BASE32_ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ';
+const CSV_HEADER = 'License Key,Status\n';
 
 /**
- * Encode buffer to Base32
+ * Worker thread: sign batches of keys on request
  */
-function base32Encode(buffer) {
-  let bits = '';
-  for (const byte of buffer) {
-    bits += byte.toString(2).padStart(8, '0');
-  }
+function runWorker() {
+  // Parse the PEM once per worker instead of once per signature
+  const privateKey = crypto.createPrivateKey(workerData.privateKeyPem);
 
-  let result = '';
-  for (let i = 0; i < bits.length; i += 5) {
-    const chunk = bits.substring(i, i + 5).padEnd(5, '0');
-    result += BASE32_ALPHABET[parseInt(chunk, 2)];
-  }
+  parentPort.on('message', (count) => {
+    const keys = new Array(count);
+    for (let i = 0; i < count; i++) {
+      keys[i] = buildLicenseKey(privateKey);
+    }
+    parentPort.postMessage(keys);
+  });
+}
 
-  return result;
+/**
+ * Key part before the signature (what makes a key unique)
+ */
+function getKeyPart(key) {
+  return key.split('.')[0];
 }
 
 /**
- * Format key with dashes
+ * Read license keys from a key pool CSV one line at a time
  */
-function formatKey(str) {
-  const chunks = [];
-  for (let i = 0; i < str.length; i += 5) {
-    chunks.push(str.substring(i, i + 5));
+async function* readPoolKeys(file) {
+  const rl = readline.createInterface({
+    input: fs.createReadStream(file),
+    crlfDelay: Infinity
+  });
+
+  for await (const line of rl) {
+    const key = line.split(',')[0].replace(/"/g, '').trim();
+    if (key && key !== 'License Key') {
+      yield key;
+    }
   }
-  return chunks.join('-');
 }
 
 /**
- * Create a single license key
+ * Bulk generate keys on worker threads, streaming unique keys to a CSV file
  */
-function createLicenseKey(privateKey) {
-  // Build payload
-  const payload = {
-    v: 1,                          // Version
-    p: 'invoice-creator',          // Product ID
-    t: 'perpetual',                // License type
-    c: Math.floor(Date.now() / 1000), // Created timestamp
-    e: null,                       // Expiry (null = never)
-  };
-
-  // Convert payload to JSON and then to Base32
-  const payloadJson = JSON.stringify(payload);
-  const payloadBuffer = Buffer.from(payloadJson, 'utf8');
-  const payloadBase32 = base32Encode(payloadBuffer);
-
-  // Pad to 25 characters for consistent key length
-  const paddedKey = payloadBase32.padEnd(25, '0').substring(0, 25);
-  const formattedKey = formatKey(paddedKey);
-
-  // Sign the key part (Ed25519 uses crypto.sign directly)
-  const signature = crypto.sign(null, Buffer.from(formattedKey), privateKey);
-  const signatureB64 = signature.toString('base64');
-
-  return `${formattedKey}.${signatureB64}`;
+async function bulkGenerate({ count, outputFile, workerCount, excludeFile, privateKeyPem }) {
+  // Seed de-duplication with keys already handed out
+  const seen = new Set();
+  if (excludeFile) {
+    for await (const key of readPoolKeys(excludeFile)) {
+      seen.add(getKeyPart(key));
+    }
+    console.log(`Loaded ${seen.size} existing keys from ${excludeFile}`);
+  }
+
+  const outputPath = path.resolve(outputFile);
+  const out = fs.createWriteStream(outputPath);
+  out.write(CSV_HEADER);
+
+  console.log(`\nGenerating ${count} license keys on ${workerCount} worker thread(s)...\n`);
+  const startTime = Date.now();
+
+  let written = 0;
+  let pending = 0;
+  let duplicates = 0;
+  let nextProgress = 10000;
+
+  const workers = Array.from({ length: workerCount }, () =>
+    new Worker(__filename, { workerData: { privateKeyPem } })
+  );
+
+  try {
+    await new Promise((resolve, reject) => {
+      // Batches are written one at a time so backpressure is respected
+      let writeQueue = Promise.resolve();
+
+      const requestBatch = (worker) => {
+        const size = Math.min(BATCH_SIZE, count - written - pending);
+        if (size > 0) {
+          pending += size;
+          worker.postMessage(size);
+        } else if (written >= count && pending === 0) {
+          resolve();
+        }
+      };
+
+      const writeBatch = async (worker, keys) => {
+        pending -= keys.length;
+        let chunk = '';
+        for (const key of keys) {
+          if (written >= count) break;
+          const keyPart = getKeyPart(key);
+          if (seen.has(keyPart)) {
+            duplicates++;
+            continue;
+          }
+          seen.add(keyPart);
+          chunk += `"${key}",available\n`;
+          written++;
+        }
+
+        if (!out.write(chunk)) {
+          await once(out, 'drain');
+        }
+
+        if (written >= nextProgress) {
+          console.log(`  ${written} / ${count}`);
+          nextProgress += 10000;
+        }
+
+        requestBatch(worker);
+      };
+
+      for (const worker of workers) {
+        worker.on('message', (keys) => {
+          writeQueue = writeQueue.then(() => writeBatch(worker, keys)).catch(reject);
+        });
+        worker.on('error', reject);
+        // A worker that dies without an 'error' event would otherwise hang the run
+        worker.on('exit', (code) => reject(new Error(`Key worker exited unexpectedly (code ${code})`)));
+        requestBatch(worker);
+      }
+
+      // Bad --output path, disk full, etc.
+      out.on('error', reject);
+    });
+  } catch (error) {
+    out.destroy();
+    throw error;
+  } finally {
+    await Promise.all(workers.map(worker => worker.terminate()));
+  }
+
+  out.end();
+  await once(out, 'finish');
+
+  const elapsed = Date.now() - startTime;
+  console.log(`\nSaved ${written} keys to: ${outputPath}`);
+  if (duplicates > 0) {
+    console.log(`Skipped ${duplicates} duplicate key(s)`);
+  }
+  console.log(`Generated ${written} keys in ${elapsed}ms`);
+}
+
+/**
+ * Verify every key in a key pool CSV (signature + duplicates), streaming the file
+ */
+async function bulkVerify(file) {
+  if (!fs.existsSync(PUBLIC_KEY_PATH)) {
+    console.error('Error: No public key found at', PUBLIC_KEY_PATH);
+    console.error('Run: node tools/license-generator.js --generate-keys');
+    process.exit(1);
+  }
+
+  const publicKey = crypto.createPublicKey(fs.readFileSync(PUBLIC_KEY_PATH, 'utf8'));
+  const seen = new Set();
+  const invalidKeys = [];
+  let valid = 0;
+  let invalid = 0;
+  let duplicates = 0;
+  const startTime = Date.now();
+
+  for await (const key of readPoolKeys(file)) {
+    const keyPart = getKeyPart(key);
+    if (seen.has(keyPart)) {
+      duplicates++;
+    }
+    seen.add(keyPart);
+
+    // The signature only proves who signed the key; also check the payload
+    // version byte so keys from another format don't pass
+    if (getKeyVersion(keyPart) === KEY_VERSION && verifyLicenseKey(key, { publicKey, silent: true })) {
+      valid++;
+    } else {
+      invalid++;
+      if (invalidKeys.length < 10) invalidKeys.push(key);
+    }
+  }
+
+  console.log('\n=== Key Pool Verification ===\n');
+  console.log('File:', path.resolve(file));
+  console.log('Valid:', valid);
+  console.log('Invalid:', invalid);
+  console.log('Duplicates:', duplicates);
+  invalidKeys.forEach(key => console.log('  Invalid key:', key));
+  console.log(`\nVerified ${valid + invalid} keys in ${Date.now() - startTime}ms`);
+
+  if (invalid > 0 || duplicates > 0) {
+    process.exitCode = 1;
+  }
 }
 
 /**
  * Main function
  */
-function main() {
+async function main() {
   const args = process.argv.slice(2);
 
   // Parse arguments
   let count = 25; // Default
   let outputFile = null;
+  let bulk = false;
+  let workerCount = Math.max(1, os.cpus().length - 1);
+  let excludeFile = null;
+  let verifyFile = null;
 
   for (let i = 0; i < args.length; i++) {
     if (args[i] === '--count' && args[i + 1]) {
@@ -96,6 +247,17 @@ function main() {
     } else if (args[i] === '--output' && args[i + 1]) {
       outputFile = args[i + 1];
       i++;
+    } else if (args[i] === '--bulk') {
+      bulk = true;
+    } else if (args[i] === '--workers' && args[i + 1]) {
+      workerCount = Math.max(1, parseInt(args[i + 1]) || 1);
+      i++;
+    } else if (args[i] === '--exclude' && args[i + 1]) {
+      excludeFile = args[i + 1];
+      i++;
+    } else if (args[i] === '--verify' && args[i + 1]) {
+      verifyFile = args[i + 1];
+      i++;
     } else if (args[i] === '--help') {
       console.log(`
 Invoice Creator - Bulk License Key Generator
@@ -104,13 +266,19 @@ Usage:
   node tools/generate-key-pool.js [options]
 
 Options:
-  --count N     Number of keys to generate (default: 25)
-  --output FILE Save keys to a CSV file
-  --help        Show this help message
+  --count N       Number of keys to generate (default: 25)
+  --output FILE   Save keys to a CSV file
+  --bulk          Sign on worker threads and stream to --output (for large pools)
+  --workers N     Worker threads for --bulk (default: CPU count - 1)
+  --exclude FILE  With --bulk, skip keys already present in an existing pool CSV
+  --verify FILE   Check signatures and duplicates of every key in a pool CSV
+  --help          Show this help message
 
 Examples:
   node tools/generate-key-pool.js --count 50
   node tools/generate-key-pool.js --count 100 --output keys.csv
+  node tools/generate-key-pool.js --bulk --count 100000 --output keys.csv
+  node tools/generate-key-pool.js --verify keys.csv
 
 After generating, copy the keys to your Google Sheet "Available Keys" tab.
 `);
@@ -118,6 +286,11 @@ After generating, copy the keys to your Google Sheet "Available Keys" tab.
     }
   }
 
+  if (verifyFile) {
+    await bulkVerify(verifyFile);
+    return;
+  }
+
   // Check for private key
   if (!fs.existsSync(PRIVATE_KEY_PATH)) {
     console.error('Error: No private key found at', PRIVATE_KEY_PATH);
@@ -125,23 +298,27 @@ After generating, copy the keys to your Google Sheet "Available Keys" tab.
     process.exit(1);
   }
 
-  const privateKey = fs.readFileSync(PRIVATE_KEY_PATH, 'utf8');
+  const privateKeyPem = fs.readFileSync(PRIVATE_KEY_PATH, 'utf8');
+
+  if (bulk) {
+    if (!outputFile) {
+      console.error('Error: --bulk requires --output FILE');
+      process.exit(1);
+    }
+    await bulkGenerate({ count, outputFile, workerCount, excludeFile, privateKeyPem });
+    return;
+  }
+
+  const privateKey = crypto.createPrivateKey(privateKeyPem);
 
   console.log(`\nGenerating ${count} license keys...\n`);
 
   const keys = [];
   const startTime = Date.now();
 
+  // Each key carries random bytes, so no delay is needed between keys
   for (let i = 0; i < count; i++) {
-    const key = createLicenseKey(privateKey);
-    keys.push(key);
-
-    // Small delay to ensure unique timestamps
-    if (i < count - 1) {
-      // Spin wait for 1ms to ensure timestamp differs
-      const waitUntil = Date.now() + 1;
-      while (Date.now() < waitUntil) {}
-    }
+    keys.push(buildLicenseKey(privateKey));
   }
 
   const elapsed = Date.now() - startTime;
@@ -149,7 +326,7 @@ After generating, copy the keys to your Google Sheet "Available Keys" tab.
   // Output
   if (outputFile) {
     // Save to CSV file
-    const csv = 'License Key,Status\n' + keys.map(k => `"${k}",available`).join('\n');
+    const csv = CSV_HEADER + keys.map(k => `"${k}",available`).join('\n');
     const outputPath = path.resolve(outputFile);
     fs.writeFileSync(outputPath, csv);
     console.log(`Saved ${count} keys to: ${outputPath}`);
@@ -171,4 +348,11 @@ After generating, copy the keys to your Google Sheet "Available Keys" tab.
   console.log('3. Column A = License Key, Column B = Status');
 }
 
-main();
+if (isMainThread) {
+  main().catch(error => {
+    console.error('Error:', error.message);
+    process.exit(1);
+  });
+} else {
+  runWorker();
+}
@@ -10,6 +10,8 @@
  *   node license-generator.js --create            Create a new license key
  *   node license-generator.js --create --machine-id=XXXX  Create machine-bound key
  *   node license-generator.js --verify KEY        Verify a license key
+ *
+ * Also used as a module by generate-key-pool.js (bulk generation/verification).
  */
 
 const crypto = require('crypto');
@@ -22,27 +24,68 @@ const KEYS_DIR = path.join(__dirname, 'keys');
 const PRIVATE_KEY_PATH = path.join(KEYS_DIR, 'private.pem');
 const PUBLIC_KEY_PATH = path.join(KEYS_DIR, 'public.pem');
 
+// Payload format version (first byte of every key)
+const KEY_VERSION = 1;
+
 // Base32 alphabet (Crockford's variant)
 const BASE32_ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ';
 
+// Reverse lookup: character -> 5-bit value
+const BASE32_LOOKUP = Object.fromEntries([...BASE32_ALPHABET].map((char, i) => [char, i]));
+
 /**
  * Encode buffer to Base32
+ * Shifts bytes through an accumulator 5 bits at a time; a trailing
+ * partial group is padded with zero bits.
  */
 function base32Encode(buffer) {
-  let bits = '';
+  let result = '';
+  let value = 0;
+  let bits = 0;
+
   for (const byte of buffer) {
-    bits += byte.toString(2).padStart(8, '0');
+    value = (value << 8) | byte;
+    bits += 8;
+    while (bits >= 5) {
+      bits -= 5;
+      result += BASE32_ALPHABET[(value >>> bits) & 31];
+    }
+    value &= (1 << bits) - 1; // Keep only unconsumed bits
   }
 
-  let result = '';
-  for (let i = 0; i < bits.length; i += 5) {
-    const chunk = bits.substring(i, i + 5).padEnd(5, '0');
-    result += BASE32_ALPHABET[parseInt(chunk, 2)];
+  if (bits > 0) {
+    result += BASE32_ALPHABET[(value << (5 - bits)) & 31];
   }
 
   return result;
 }
 
+/**
+ * Decode Base32 string to buffer (trailing bits that don't fill a byte are dropped)
+ */
+function base32Decode(str) {
+  const bytes = Buffer.alloc(Math.floor(str.length * 5 / 8));
+  let value = 0;
+  let bits = 0;
+  let index = 0;
+
+  for (const char of str) {
+    const chunk = BASE32_LOOKUP[char];
+    if (chunk === undefined) {
+      throw new Error(`Invalid Base32 character: ${char}`);
+    }
+    value = (value << 5) | chunk;
+    bits += 5;
+    if (bits >= 8) {
+      bits -= 8;
+      bytes[index++] = (value >>> bits) & 255;
+      value &= (1 << bits) - 1;
+    }
+  }
+
+  return bytes;
+}
+
 /**
  * Format key with dashes
  */
@@ -54,6 +97,19 @@ function formatKey(str) {
   return chunks.join('-');
 }
 
+/**
+ * Read the payload version byte from the key part (before the signature)
+ * Returns null if the key part isn't valid Base32.
+ */
+function getKeyVersion(keyPart) {
+  try {
+    const payload = base32Decode(keyPart.replace(/-/g, ''));
+    return payload.length > 0 ? payload[0] : null;
+  } catch {
+    return null;
+  }
+}
+
 /**
  * Generate a new Ed25519 keypair
  */
@@ -80,6 +136,35 @@ function generateKeyPair() {
   console.log(publicKey);
 }
 
+/**
+ * Build and sign a license key (no output)
+ * privateKey may be a PEM string or a KeyObject - pass a KeyObject when
+ * signing many keys so the PEM is only parsed once.
+ */
+function buildLicenseKey(privateKey, timestamp = Math.floor(Date.now() / 1000)) {
+  // Generate unique random bytes for the key (makes each key visually unique)
+  const randomBytes = crypto.randomBytes(12);
+
+  // Build payload buffer: 1 byte version + 4 bytes timestamp + 12 bytes random
+  const payloadBuffer = Buffer.alloc(17);
+  payloadBuffer.writeUInt8(KEY_VERSION, 0);  // Version
+  payloadBuffer.writeUInt32BE(timestamp, 1);  // Timestamp
+  randomBytes.copy(payloadBuffer, 5);  // Random bytes
+
+  // Encode the unique payload buffer to Base32
+  const payloadBase32 = base32Encode(payloadBuffer);
+
+  // Use 25 characters for the key (covers all 17 bytes = 28 base32 chars, we use 25)
+  const paddedKey = payloadBase32.substring(0, 25);
+  const formattedKey = formatKey(paddedKey);
+
+  // Sign the key part (Ed25519 uses crypto.sign directly)
+  const signature = crypto.sign(null, Buffer.from(formattedKey), privateKey);
+  const signatureB64 = signature.toString('base64');
+
+  return `${formattedKey}.${signatureB64}`;
+}
+
 /**
  * Create a new license key
  */
@@ -90,17 +175,8 @@ function createLicenseKey(options = {}) {
   }
 
   const privateKey = fs.readFileSync(PRIVATE_KEY_PATH, 'utf8');
-
-  // Generate unique random bytes for the key (makes each key visually unique)
-  const randomBytes = crypto.randomBytes(12);
   const timestamp = Math.floor(Date.now() / 1000);
 
-  // Build payload buffer: 1 byte version + 4 bytes timestamp + 12 bytes random
-  const payloadBuffer = Buffer.alloc(17);
-  payloadBuffer.writeUInt8(1, 0);  // Version
-  payloadBuffer.writeUInt32BE(timestamp, 1);  // Timestamp
-  randomBytes.copy(payloadBuffer, 5);  // Random bytes
-
   // Legacy payload for logging only
   const payload = {
     v: 1,                          // Version
@@ -115,18 +191,7 @@ function createLicenseKey(options = {}) {
     payload.m = options.machineId;
   }
 
-  // Encode the unique payload buffer to Base32
-  const payloadBase32 = base32Encode(payloadBuffer);
-
-  // Use 25 characters for the key (covers all 17 bytes = 28 base32 chars, we use 25)
-  const paddedKey = payloadBase32.substring(0, 25);
-  const formattedKey = formatKey(paddedKey);
-
-  // Sign the key part (Ed25519 uses crypto.sign directly)
-  const signature = crypto.sign(null, Buffer.from(formattedKey), privateKey);
-  const signatureB64 = signature.toString('base64');
-
-  const fullKey = `${formattedKey}.${signatureB64}`;
+  const fullKey = buildLicenseKey(privateKey, timestamp);
 
   console.log('\n=== License Key Generated ===\n');
   console.log('Key:', fullKey);
@@ -138,18 +203,24 @@ function createLicenseKey(options = {}) {
 
 /**
  * Verify a license key
+ * Options (for bulk use): publicKey - PEM or KeyObject to skip reading the file,
+ * silent - don't print the result
  */
-function verifyLicenseKey(key) {
-  if (!fs.existsSync(PUBLIC_KEY_PATH)) {
-    console.error('Error: No public key found. Run with --generate-keys first.');
-    process.exit(1);
+function verifyLicenseKey(key, options = {}) {
+  const { silent = false } = options;
+  let { publicKey } = options;
+
+  if (!publicKey) {
+    if (!fs.existsSync(PUBLIC_KEY_PATH)) {
+      console.error('Error: No public key found. Run with --generate-keys first.');
+      process.exit(1);
+    }
+    publicKey = fs.readFileSync(PUBLIC_KEY_PATH, 'utf8');
   }
 
-  const publicKey = fs.readFileSync(PUBLIC_KEY_PATH, 'utf8');
-
   const parts = key.split('.');
   if (parts.length !== 2) {
-    console.log('Invalid key format');
+    if (!silent) console.log('Invalid key format');
     return false;
   }
 
@@ -160,13 +231,15 @@ function verifyLicenseKey(key) {
     // Ed25519 uses crypto.verify directly
     const isValid = crypto.verify(null, Buffer.from(keyPart), publicKey, signature);
 
-    console.log('\n=== License Key Verification ===\n');
-    console.log('Key:', key);
-    console.log('Valid:', isValid ? 'YES' : 'NO');
+    if (!silent) {
+      console.log('\n=== License Key Verification ===\n');
+      console.log('Key:', key);
+      console.log('Valid:', isValid ? 'YES' : 'NO');
+    }
 
     return isValid;
   } catch (error) {
-    console.error('Verification error:', error.message);
+    if (!silent) console.error('Verification error:', error.message);
     return false;
   }
 }
@@ -206,32 +279,36 @@ async function interactiveCreate() {
   createLicenseKey({ type, expiry, machineId });
 }
 
-// Parse command line arguments
-const args = process.argv.slice(2);
-
-if (args.includes('--generate-keys')) {
-  generateKeyPair();
-} else if (args.includes('--quick')) {
-  // Quick generate - no prompts, perpetual license
-  quickGenerate();
-} else if (args.includes('--create')) {
-  const machineIdArg = args.find(a => a.startsWith('--machine-id='));
-  const machineId = machineIdArg ? machineIdArg.split('=')[1] : null;
-
-  if (args.includes('--interactive') || args.length === 1) {
-    interactiveCreate();
-  } else {
-    createLicenseKey({ machineId });
-  }
-} else if (args.includes('--verify')) {
-  const keyIndex = args.indexOf('--verify') + 1;
-  if (keyIndex < args.length) {
-    verifyLicenseKey(args[keyIndex]);
+/**
+ * Main function
+ */
+function main() {
+  // Parse command line arguments
+  const args = process.argv.slice(2);
+
+  if (args.includes('--generate-keys')) {
+    generateKeyPair();
+  } else if (args.includes('--quick')) {
+    // Quick generate - no prompts, perpetual license
+    quickGenerate();
+  } else if (args.includes('--create')) {
+    const machineIdArg = args.find(a => a.startsWith('--machine-id='));
+    const machineId = machineIdArg ? machineIdArg.split('=')[1] : null;
+
+    if (args.includes('--interactive') || args.length === 1) {
+      interactiveCreate();
+    } else {
+      createLicenseKey({ machineId });
+    }
+  } else if (args.includes('--verify')) {
+    const keyIndex = args.indexOf('--verify') + 1;
+    if (keyIndex < args.length) {
+      verifyLicenseKey(args[keyIndex]);
+    } else {
+      console.error('Usage: node license-generator.js --verify LICENSE_KEY');
+    }
   } else {
-    console.error('Usage: node license-generator.js --verify LICENSE_KEY');
-  }
-} else {
-  console.log(`
+    console.log(`
 Invoice Creator License Key Generator
 
 Usage:
@@ -249,4 +326,22 @@ To generate a key for a customer:
   1. Run: node license-generator.js --create
   2. Give the generated key to your customer
 `);
+  }
+}
+
+if (require.main === module) {
+  main();
 }
+
+module.exports = {
+  KEYS_DIR,
+  PRIVATE_KEY_PATH,
+  PUBLIC_KEY_PATH,
+  KEY_VERSION,
+  base32Encode,
+  base32Decode,
+  formatKey,
+  getKeyVersion,
+  buildLicenseKey,
+  verifyLicenseKey
+};